@@ -0,0 +1,113 @@
+# ----------------------------------------------------------------------------#
+# Read-only JSON API (/api/v1).
+#
+# Every response carries a strong ETag computed from the path, the query
+# string, the (id, version) of the rows it contains and, for a list, its
+# next/prev cursors, before anything is serialized; a matching If-None-Match
+# is answered with 304. List endpoints use the keyset pagination of the HTML
+# listings and accept ?fields= to return only some attributes.
+# ----------------------------------------------------------------------------#
+import hashlib
+from datetime import datetime
+
+from flask import Blueprint, Response, abort, jsonify, request
+
+from models import Artist, Show, Venue, db
+from pagination import keyset_paginate, page_args
+
+api = Blueprint("api_v1", __name__, url_prefix="/api/v1")
+
+RESOURCES = {
+    "venues": (Venue, Venue.venue_details),
+    "artists": (Artist, Artist.artist_info),
+    "shows": (Show, Show.show_details),
+}
+
+
+def _etag(rows, *cursors):
+    digest = hashlib.sha1(request.full_path.encode())
+    for row in rows:
+        digest.update(f"{row.id}:{row.version};".encode())
+    # the cursors are part of a list body: a row added after the last page
+    # gives it a next cursor without changing its rows
+    for cursor in cursors:
+        digest.update(f"{cursor or ''};".encode())
+    return digest.hexdigest()
+
+
+def _not_modified(etag):
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+def _plain(data):
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in data.items()
+    }
+
+
+def _fields(serialize, model):
+    fields = request.args.get("fields")
+    if not fields:
+        return None
+    fields = [field.strip() for field in fields.split(",") if field.strip()]
+    # the attributes a row serializes to, without loading one
+    known = serialize(model()).keys()
+    unknown = [field for field in fields if field not in known]
+    if unknown:
+        abort(400, f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+@api.errorhandler(400)
+@api.errorhandler(404)
+def api_error(error):
+    return jsonify(error=error.description), error.code
+
+
+@api.route("/<any(venues, artists, shows):resource>")
+def list_resource(resource):
+    model, serialize = RESOURCES[resource]
+    fields = _fields(serialize, model)
+    after, before, limit = page_args()
+    page = keyset_paginate(
+        model.query,
+        (model.id,),
+        lambda row: (row.id,),
+        after=after,
+        before=before,
+        limit=limit,
+    )
+    etag = _etag(page.items, page.next_cursor, page.prev_cursor)
+    response = _not_modified(etag)
+    if response is not None:
+        return response
+
+    data = []
+    for row in page.items:
+        item = _plain(serialize(row))
+        if fields:
+            item = {field: item[field] for field in fields}
+        data.append(item)
+    response = jsonify(data=data, next=page.next_cursor, prev=page.prev_cursor)
+    response.set_etag(etag)
+    return response
+
+
+@api.route("/<any(venues, artists, shows):resource>/<int:id>")
+def get_resource(resource, id):
+    model, serialize = RESOURCES[resource]
+    row = db.session.get(model, id)
+    if row is None:
+        abort(404)
+    etag = _etag([row])
+    response = _not_modified(etag)
+    if response is not None:
+        return response
+    response = jsonify(_plain(serialize(row)))
+    response.set_etag(etag)
+    return response
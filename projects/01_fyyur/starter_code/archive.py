@@ -0,0 +1,72 @@
+# ----------------------------------------------------------------------------#
+# Archiving of the old shows (`flask archive-shows`, to be run nightly).
+#
+# Shows that started more than SHOWS_ARCHIVE_AFTER_DAYS ago are moved from
+# ``shows`` to ``shows_archive``, oldest first and ``batch_size`` at a time.
+# Each batch copies and deletes its rows in one transaction, so an
+# interrupted run loses nothing and the next one carries on where it
+# stopped. On Postgres the whole months before the horizon are moved first
+# by swapping their partitions (see partitions.py); only the rows of the
+# horizon's own month are copied.
+#
+# The venue and artist pages only read the archive once the visitor pages
+# past the last past show left in ``shows`` (see queries.archive_statement).
+# The counters are not touched: archived shows stay counted as past.
+# ----------------------------------------------------------------------------#
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+
+import partitions
+from models import ArchivedShow, Show, db
+
+
+def horizon(days, now=None):
+    """Start time before which shows are archived."""
+    return (now or datetime.now()) - timedelta(days=days)
+
+
+def archive_shows(before, batch_size=1000, progress=None):
+    """Move the shows starting before ``before`` to ``shows_archive``.
+
+    Returns ``(months, rows)``: the months moved as whole partitions
+    (Postgres only) and the number of rows moved by batches. ``progress`` is
+    called with the running row count after every batch.
+    """
+    months = []
+    with db.engine.begin() as connection:
+        if partitions.is_partitioned(connection):
+            month = partitions.month_start(before)
+            months = partitions.retire(connection, month)
+            if month not in partitions.partition_months(connection, "shows_archive"):
+                partitions.create_partition(connection, "shows_archive", month)
+
+    columns = [column.name for column in Show.__table__.columns]
+    old = Show.start_time < before
+    moved = 0
+    while True:
+        with db.engine.begin() as connection:
+            ids = connection.scalars(
+                select(Show.id)
+                .where(old)
+                .order_by(Show.start_time, Show.id)
+                .limit(batch_size)
+            ).all()
+            if not ids:
+                break
+            # start_time is repeated so that Postgres only visits the
+            # partitions before the horizon
+            batch = Show.id.in_(ids)
+            connection.execute(
+                insert(ArchivedShow).from_select(
+                    columns,
+                    select(*(Show.__table__.c[name] for name in columns)).where(
+                        old, batch
+                    ),
+                )
+            )
+            connection.execute(delete(Show).where(old, batch))
+        moved += len(ids)
+        if progress is not None:
+            progress(moved)
+    return months, moved
@@ -0,0 +1,163 @@
+# ----------------------------------------------------------------------------#
+# Artist views: listing, search, artist page, create and edit.
+# ----------------------------------------------------------------------------#
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+
+import queries
+import search
+import suggest
+from extensions import page_cache
+from models import Artist, db, genres_by_name
+
+blueprint = Blueprint("artists", __name__)
+
+
+@blueprint.route("/artists")
+@page_cache.cached(lambda: ("artists",))
+def artists():
+    page = queries.paginate(*queries.artist_listing(request.args.get("genre")))
+    return render_template("pages/artists.html", artists=page.items, page=page)
+
+
+@blueprint.route("/artists/search", methods=["POST"])
+def search_artists():
+    # ranked search on name, city, state and genres (see search.py)
+    # seach for "A" should return "Guns N Petals", "Matt Quevado", and "The Wild Sax Band".
+    # search for "band" should return "The Wild Sax Band".
+    search_key = request.form.get("search_term", "")
+    artist = search.search_artists(search_key)
+    response = {
+        "count": len(artist),
+        "data": artist,
+    }
+    return render_template(
+        "pages/search_artists.html",
+        results=response,
+        search_term=request.form.get("search_term", ""),
+    )
+
+
+@blueprint.route("/artists/<int:artist_id>")
+@page_cache.cached(lambda artist_id: (f"artist:{artist_id}", "artist-pages"))
+def show_artist(artist_id):
+    # shows the artist page with the given artist_id
+    data = queries.detail_with_shows(queries.ARTIST_DETAIL, artist_id)
+    return render_template("pages/show_artist.html", artist=data)
+
+
+#  Update
+#  ----------------------------------------------------------------
+
+
+@blueprint.route("/artists/<int:artist_id>/edit", methods=["GET"])
+def edit_artist(artist_id):
+    from forms import ArtistForm
+
+    artist_data = Artist.query.filter(Artist.id == artist_id).first()
+    form = ArtistForm()
+    artist = {
+        "id": artist_data.id,
+        "name": artist_data.name,
+        "genres": artist_data.genres,
+        "city": artist_data.city,
+        "state": artist_data.state,
+        "phone": artist_data.phone,  # "326-123-5000",
+        "website": artist_data.website_link,
+        "facebook_link": artist_data.facebook_link,
+        "seeking_venue": artist_data.seeking_venue,
+        "seeking_description": artist_data.seeking_description,
+        "image_link": artist_data.image_link,
+    }
+    # TODO: populate form with fields from artist with ID <artist_id>
+    return render_template("forms/edit_artist.html", form=form, artist=artist)
+
+
+@blueprint.route("/artists/<int:artist_id>/edit", methods=["POST"])
+def edit_artist_submission(artist_id):
+    # TODO: take values from the form submitted, and update existing
+    # artist record with ID <artist_id> using the new attributes
+    artist = Artist.query.filter(Artist.id == artist_id).first()
+    try:
+        artist.name = request.form.get("name")
+        artist.city = request.form.get("city")
+        artist.state = request.form.get("state")
+        artist.phone = request.form.get("phone")
+        artist.genres = request.form.get("genres")
+        artist.genre_tags = genres_by_name(request.form.getlist("genres"))
+        artist.image_link = request.form.get("image_link")
+        artist.facebook_link = request.form.get("facebook_link")
+        artist.website_link = request.form.get("website_link")
+        artist.seeking_venue = request.form.get("seeking_venue") == "y"
+        artist.seeking_description = request.form.get("seeking_description")
+        db.session.commit()
+        suggest.add("artist", artist.id, artist.name)
+        page_cache.invalidate("artists", f"artist:{artist_id}", "shows", "venue-pages")
+    except:
+        db.session.rollback()
+        flash(f"artist {artist.name} data could not be updated")
+    finally:
+        db.session.close()
+    return redirect(url_for("artists.show_artist", artist_id=artist_id))
+
+
+#  Create Artist
+#  ----------------------------------------------------------------
+
+
+@blueprint.route("/artists/create", methods=["GET"])
+def create_artist_form():
+    from forms import ArtistForm
+
+    form = ArtistForm()
+    return render_template("forms/new_artist.html", form=form)
+
+
+@blueprint.route("/artists/create", methods=["POST"])
+def create_artist_submission():
+    # called upon submitting the new artist listing form
+    # TODO: insert form data as a new Venue record in the db, instead
+    # TODO: modify data to be the data object returned from db insertion
+
+    name = request.form.get("name")
+    city = request.form.get("city")
+    state = request.form.get("state")
+    phone = request.form.get("phone")
+    image_link = request.form.get("image_link")
+    genres = request.form.get("genres")
+    facebook_link = request.form.get("facebook_link")
+    website_link = request.form.get("website_link")
+    seeking_venue = request.form.get("seeking_venue")
+    seeking_description = request.form.get("seeking_description")
+
+    # somehow, the form returns a String from "seeking venue" field
+    # this checks if the string returned is 'y' and assigns the seeking_artist to "True"
+    if seeking_venue == "y":
+        seeking_venue = True
+    else:
+        seeking_venue = False
+    # create artist object
+    data = Artist(
+        name=name,
+        city=city,
+        state=state,
+        phone=phone,
+        genres=genres,
+        image_link=image_link,
+        facebook_link=facebook_link,
+        website_link=website_link,
+        seeking_venue=seeking_venue,
+        seeking_description=seeking_description,
+    )
+    try:
+        data.genre_tags = genres_by_name(request.form.getlist("genres"))
+        db.session.add(data)
+        db.session.commit()
+        suggest.add("artist", data.id, data.name)
+        page_cache.invalidate("artists")
+        flash("Artist " + request.form["name"] + " was successfully listed!")
+    except:
+        db.session.rollback()
+        flash("An error occurred. Artist " + data.name + " could not be listed.")
+    finally:
+        db.session.close()
+    return render_template("pages/home.html")
@@ -0,0 +1,304 @@
+# ----------------------------------------------------------------------------#
+# ASGI entry point.
+#
+#     uvicorn asgi:application --workers 4
+#
+# The read views (venue, artist and show listings, the venue and artist pages
+# and the searches) are served by coroutines: they run the statements of
+# queries.py/search.py on an AsyncSession (asyncpg or aiosqlite, see
+# ASYNC_DATABASE_URI) and render the usual templates with Jinja's async mode,
+# so a worker keeps serving other requests while one waits on the database.
+# They share the page cache of the WSGI app. Every other route, and the error
+# pages, go through the regular Flask views in a worker thread.
+# ----------------------------------------------------------------------------#
+import asyncio
+import contextvars
+import io
+import sys
+
+from flask import abort, request
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.exceptions import HTTPException
+
+import config
+import queries
+import search
+import templating
+from app import app
+from db_pool import async_database_uri, async_engine_options, init_engine
+from extensions import page_cache
+from models import Artist, Venue
+from pagination import keyset_statement, page_args, page_from_rows
+
+engine = create_async_engine(async_database_uri(config), **async_engine_options(config))
+init_engine(engine.sync_engine, config)
+Session = async_sessionmaker(engine, expire_on_commit=False)
+
+# shares the loader, filters and globals of app.jinja_env
+templates = templating.async_environment(app)
+
+# endpoint -> (coroutine, page cache tags or None)
+READ_VIEWS = {}
+
+
+def read_view(endpoint, tags=None):
+    def decorator(view):
+        READ_VIEWS[endpoint] = (view, tags)
+        return view
+
+    return decorator
+
+
+async def render(template_name, **context):
+    app.update_template_context(context)
+    template = templates.get_template(template_name)
+    return await template.render_async(context)
+
+
+async def paginate(session, statement, sort_columns, row_key):
+    after, before, limit = page_args()
+    result = await session.execute(
+        keyset_statement(statement, sort_columns, after, before, limit)
+    )
+    return page_from_rows(result.all(), row_key, after, before, limit)
+
+
+async def detail_with_shows(session, detail, owner_id):
+    (model, *columns), prefix = detail
+    limit = app.config.get("PAST_SHOWS_PAGE_SIZE", 20)
+    past_before = request.args.get("past_before")
+    statement = queries.detail_statement(
+        model, *columns, owner_id, past_before=past_before, limit=limit
+    )
+    rows = (await session.execute(statement)).all()
+    if queries.reaches_archive(rows, limit):
+        statement = queries.archive_statement(*columns, owner_id, past_before, limit)
+        rows += (await session.execute(statement)).all()
+    details = queries.detail_from_rows(rows, prefix, limit)
+    if details is None:
+        abort(404)
+    return details
+
+
+async def search_rows(session, model, term):
+    term = term.strip()
+    if not term:
+        return []
+    connection = await session.connection()
+    dialect = connection.dialect.name
+    indexed = await connection.run_sync(search.has_search_index, model)
+    statement = search.search_statement(model, term, dialect, indexed)
+    result = await session.execute(statement)
+    return result.all()
+
+
+#  Views
+#  ----------------------------------------------------------------
+
+
+@read_view("venues.venues", lambda: ("venues",))
+async def venues(session):
+    page = await paginate(session, *queries.venue_listing(request.args.get("genre")))
+    return await render(
+        "pages/venues.html", areas=queries.group_areas(page.items), page=page
+    )
+
+
+@read_view("venues.show_venue", lambda venue_id: (f"venue:{venue_id}", "venue-pages"))
+async def show_venue(session, venue_id):
+    details = await detail_with_shows(session, queries.VENUE_DETAIL, venue_id)
+    data = details.pop("owner").venue_details()
+    data.update(details)
+    return await render("pages/show_venue.html", venue=data)
+
+
+@read_view("artists.artists", lambda: ("artists",))
+async def artists(session):
+    page = await paginate(session, *queries.artist_listing(request.args.get("genre")))
+    return await render("pages/artists.html", artists=page.items, page=page)
+
+
+@read_view(
+    "artists.show_artist", lambda artist_id: (f"artist:{artist_id}", "artist-pages")
+)
+async def show_artist(session, artist_id):
+    details = await detail_with_shows(session, queries.ARTIST_DETAIL, artist_id)
+    data = details.pop("owner").artist_info()
+    data.update(details)
+    return await render("pages/show_artist.html", artist=data)
+
+
+@read_view("shows.shows", lambda: ("shows",))
+async def shows(session):
+    page = await paginate(session, *queries.show_listing())
+    return await render(
+        "pages/shows.html", shows=queries.show_tiles(page.items), page=page
+    )
+
+
+@read_view("venues.search_venues")
+async def search_venues(session):
+    search_term = request.form.get("search_term", "")
+    data = await search_rows(session, Venue, search_term)
+    return await render(
+        "pages/search_venues.html",
+        results={"count": len(data), "data": data},
+        search_term=search_term,
+    )
+
+
+@read_view("artists.search_artists")
+async def search_artists(session):
+    search_term = request.form.get("search_term", "")
+    data = await search_rows(session, Artist, search_term)
+    return await render(
+        "pages/search_artists.html",
+        results={"count": len(data), "data": data},
+        search_term=search_term,
+    )
+
+
+#  ASGI
+#  ----------------------------------------------------------------
+
+
+async def _dispatch_read(view, tags):
+    async def call():
+        async with Session() as session:
+            return await view(session, **request.view_args)
+
+    if tags is None or page_cache.bypass():
+        return await call()
+    page_tags = tags(**request.view_args)
+    key = page_cache.key(page_tags)
+    page = page_cache.get(key)
+    if page is None:
+        page = await call()
+        page_cache.store(key, page, page_tags)
+    return page
+
+
+async def _handle():
+    """Return the response and the context its body must be read in."""
+    read = READ_VIEWS.get(request.endpoint) if request.url_rule else None
+    if read is None:
+        # the WSGI views, in a thread of their own context so that streamed
+        # bodies (stream_with_context) can be read there later
+        context = contextvars.copy_context()
+        response = await _in_thread(context, app.full_dispatch_request)
+        return response, context
+    try:
+        try:
+            rv = app.preprocess_request()
+            if rv is None:
+                rv = await _dispatch_read(*read)
+        except HTTPException as e:
+            rv = app.handle_user_exception(e)
+        return app.finalize_request(rv), None
+    except Exception as e:
+        return app.handle_exception(e), None
+
+
+async def _in_thread(context, function, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, context.run, function, *args)
+
+
+def _environ(scope, body):
+    """WSGI environ of an ASGI http ``scope``."""
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+        "PATH_INFO": scope["path"].encode().decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[name] = value
+            continue
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def _read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return bytes(body)
+
+
+async def _send_response(send, response, environ, context):
+    app_iter, status, headers = response.get_wsgi_response(environ)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": int(status.split(" ", 1)[0]),
+            "headers": [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in headers
+            ],
+        }
+    )
+    try:
+        if context is None or response.is_sequence:
+            for chunk in app_iter:
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+        else:
+            chunks = iter(app_iter)
+            while True:
+                chunk = await _in_thread(context, next, chunks, None)
+                if chunk is None:
+                    break
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+    finally:
+        if hasattr(app_iter, "close"):
+            if context is None:
+                app_iter.close()
+            else:
+                await _in_thread(context, app_iter.close)
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await engine.dispose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+    environ = _environ(scope, await _read_body(receive))
+    with app.request_context(environ):
+        response, context = await _handle()
+        await _send_response(send, response, environ, context)
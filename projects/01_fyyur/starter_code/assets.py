@@ -0,0 +1,214 @@
+# ----------------------------------------------------------------------------#
+# Static asset pipeline (`flask build-assets`).
+#
+# The stylesheets and scripts of layouts/main.html are concatenated into a few
+# bundles, minified, and written to static/dist under content-hashed names
+# (main.3f2a9c1b0d4e.css) with gzip and, when the brotli package is installed,
+# brotli copies next to them. static/dist/manifest.json maps every bundle to
+# its built file and lists the files it was built from.
+#
+# Templates call ``bundle_urls("main.css")``: the hashed URL once the assets
+# are built (and ASSETS_BUNDLED is on), the URLs of the source files
+# otherwise. Built files never change, so they are served with a one-year
+# immutable Cache-Control and in the precompressed encoding the client
+# accepts.
+#
+# Bundles stay in static/dist, one level below static/ like static/css, so
+# the relative URLs inside the stylesheets (../fonts/...) still resolve.
+# ----------------------------------------------------------------------------#
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+
+from flask import request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # optional, only gzip copies without it
+    brotli = None
+
+try:
+    import rcssmin
+except ImportError:  # optional, see minify_css
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:  # optional, scripts are only concatenated without it
+    rjsmin = None
+
+# bundle -> source files relative to static/, in page order
+BUNDLES = {
+    "main.css": [
+        "css/bootstrap.min.css",
+        "css/layout.main.css",
+        "css/main.css",
+        "css/main.responsive.css",
+        "css/main.quickfix.css",
+    ],
+    # loaded in <head>, before the page is parsed
+    "head.js": [
+        "js/libs/modernizr-2.8.2.min.js",
+        "js/libs/moment.min.js",
+    ],
+    # deferred, after jQuery
+    "main.js": [
+        "js/script.js",
+        "js/libs/bootstrap-3.1.1.min.js",
+        "js/plugins.js",
+    ],
+}
+DIST = "dist"
+MANIFEST = "manifest.json"
+# encodings of the precompressed copies, in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+MAX_AGE = 365 * 24 * 3600
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_SPACE = re.compile(r"\s+")
+_AROUND = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(source):
+    if rcssmin is not None:
+        return rcssmin.cssmin(source)
+    # comments, runs of whitespace and the spaces around punctuation; the
+    # space before ":" is kept, it matters in selectors (a :hover)
+    css = _COMMENT.sub("", source)
+    css = _SPACE.sub(" ", css)
+    css = _AROUND.sub(r"\1", css)
+    return css.replace(": ", ":").replace(";}", "}").strip()
+
+
+def minify_js(source):
+    if rjsmin is not None:
+        return rjsmin.jsmin(source)
+    return source
+
+
+def build_bundle(static_folder, sources):
+    """The minified concatenation of ``sources``."""
+    minify = minify_css if sources[0].endswith(".css") else minify_js
+    parts = []
+    for source in sources:
+        with open(os.path.join(static_folder, source), encoding="utf-8") as f:
+            parts.append(minify(f.read()))
+    # a script without a final semicolon must not run into the next one
+    separator = "\n" if minify is minify_css else ";\n"
+    return separator.join(parts).encode()
+
+
+def hashed_name(name, content):
+    root, ext = os.path.splitext(name)
+    return f"{root}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+
+
+def precompress(path, content):
+    """Write the missing gzip and brotli copies of ``path`` that are smaller."""
+    compressors = {".gz": lambda: gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressors[".br"] = lambda: brotli.compress(content, quality=11)
+    for suffix, compress in compressors.items():
+        if os.path.exists(path + suffix):
+            continue
+        compressed = compress()
+        if len(compressed) < len(content):
+            with open(path + suffix, "wb") as f:
+                f.write(compressed)
+
+
+def build_assets(static_folder, clean=False):
+    """Build every bundle into static/dist, return the manifest.
+
+    With ``clean``, the files of earlier builds are removed; by default they
+    are kept for the pages still referring to them.
+    """
+    dist = os.path.join(static_folder, DIST)
+    os.makedirs(dist, exist_ok=True)
+    manifest = {"bundles": {}, "sources": BUNDLES}
+    for name, sources in BUNDLES.items():
+        content = build_bundle(static_folder, sources)
+        filename = hashed_name(name, content)
+        path = os.path.join(dist, filename)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(content)
+        precompress(path, content)
+        manifest["bundles"][name] = filename
+    if clean:
+        built = set(manifest["bundles"].values())
+        for filename in os.listdir(dist):
+            original = filename
+            for _, suffix in ENCODINGS:
+                original = original.removesuffix(suffix)
+            if filename != MANIFEST and original not in built:
+                os.remove(os.path.join(dist, filename))
+    with open(os.path.join(dist, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class Assets:
+    def __init__(self, app=None):
+        self.bundles = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("ASSETS_BUNDLED", True)
+        if app.config["ASSETS_BUNDLED"]:
+            self.load_manifest(app.static_folder)
+        app.jinja_env.globals["bundle_urls"] = self.bundle_urls
+        static_view = app.view_functions["static"]
+
+        def static(filename):
+            if filename.startswith(DIST + "/") and not filename.endswith(MANIFEST):
+                return self.send_built(app.static_folder, filename)
+            return static_view(filename=filename)
+
+        app.view_functions["static"] = static
+        app.extensions["assets"] = self
+
+    def load_manifest(self, static_folder):
+        path = os.path.join(static_folder, DIST, MANIFEST)
+        try:
+            with open(path) as f:
+                self.bundles = json.load(f)["bundles"]
+        except FileNotFoundError:
+            self.bundles = {}
+
+    def build(self, static_folder, clean=False):
+        manifest = build_assets(static_folder, clean)
+        self.bundles = manifest["bundles"]
+        return manifest
+
+    def bundle_urls(self, name):
+        """URLs to include for bundle ``name``: the built file or its sources."""
+        if name in self.bundles:
+            return [url_for("static", filename=f"{DIST}/{self.bundles[name]}")]
+        return [url_for("static", filename=source) for source in BUNDLES[name]]
+
+    def send_built(self, static_folder, filename):
+        directory = os.path.join(static_folder, DIST)
+        name = filename[len(DIST) + 1 :]
+        mimetype = mimetypes.guess_type(name)[0]
+        encoding = None
+        for candidate, suffix in ENCODINGS:
+            if request.accept_encodings[candidate] and os.path.exists(
+                os.path.join(directory, name + suffix)
+            ):
+                encoding = candidate
+                name += suffix
+                break
+        response = send_from_directory(
+            directory, name, mimetype=mimetype, max_age=MAX_AGE
+        )
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
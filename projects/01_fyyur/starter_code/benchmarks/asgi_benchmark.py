@@ -0,0 +1,167 @@
+"""Compare the WSGI app with the ASGI entry point under concurrent reads.
+
+Starts each server with the same number of worker processes (gunicorn sync
+workers for app:app, uvicorn workers for asgi:application), requests the read
+routes from --concurrency client threads for --duration seconds and reports
+throughput and latency percentiles:
+
+    python benchmarks/asgi_benchmark.py --workers 4 --concurrency 64
+
+The page cache is disabled in both servers so that every request reaches the
+database configured in config.py. Needs gunicorn, uvicorn and the asyncio
+driver of the database (asyncpg or aiosqlite).
+"""
+
+import argparse
+import itertools
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PATHS = [
+    "/venues",
+    "/artists",
+    "/shows",
+    "/venues/1",
+    "/artists/1",
+]
+
+
+def server_command(kind, target, workers, port):
+    if kind == "wsgi":
+        return [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--workers",
+            str(workers),
+            "--bind",
+            f"127.0.0.1:{port}",
+            target,
+        ]
+    return [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "--workers",
+        str(workers),
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+        target,
+    ]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(base_url + "/", timeout=1).read()
+            return
+        except (OSError, urllib.error.URLError):
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not start")
+
+
+def load(base_url, paths, concurrency, duration):
+    """Latencies (seconds) of the successful requests and the error count."""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    stop = time.monotonic() + duration
+
+    def worker(offset):
+        nonlocal errors
+        for path in itertools.islice(itertools.cycle(paths), offset, None):
+            if time.monotonic() > stop:
+                return
+            start = time.perf_counter()
+            try:
+                urllib.request.urlopen(base_url + path, timeout=30).read()
+            except (OSError, urllib.error.URLError):
+                with lock:
+                    errors += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [
+        threading.Thread(target=worker, args=(i % len(paths),))
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def percentile(values, fraction):
+    return sorted(values)[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(kind, target, args):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, PAGE_CACHE_BACKEND="null")
+    server = subprocess.Popen(
+        server_command(kind, target, args.workers, port), cwd=ROOT, env=env
+    )
+    try:
+        wait_until_up(base_url)
+        # warm up every worker's connections and compiled templates
+        load(base_url, args.paths, args.concurrency, 1)
+        latencies, errors = load(base_url, args.paths, args.concurrency, args.duration)
+    finally:
+        server.terminate()
+        server.wait()
+    if not latencies:
+        print(f"{kind:<5} no successful request ({errors} errors)")
+        return
+    print(
+        f"{kind:<5} {len(latencies) / args.duration:>9.1f} "
+        f"{statistics.mean(latencies) * 1000:>9.1f} "
+        f"{percentile(latencies, 0.5) * 1000:>8.1f} "
+        f"{percentile(latencies, 0.95) * 1000:>8.1f} "
+        f"{percentile(latencies, 0.99) * 1000:>8.1f} {errors:>7}"
+    )
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10, help="Seconds.")
+    parser.add_argument("--wsgi", default="app:app", help="WSGI app to serve.")
+    parser.add_argument("--asgi", default="asgi:application", help="ASGI app.")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS)
+    args = parser.parse_args(argv)
+    print(
+        f"{args.workers} workers, {args.concurrency} concurrent clients, "
+        f"{args.duration:g}s per server"
+    )
+    print(
+        f"{'mode':<5} {'req/s':>9} {'mean ms':>9} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    )
+    run("wsgi", args.wsgi, args)
+    run("asgi", args.asgi, args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,108 @@
+"""Time the rendering of show tiles with the different date formatters.
+
+Renders the tile markup of shows.html for --tiles shows (start times spread
+like the seed data's) with:
+
+- the old filter, parsing ``str(start_time)`` and formatting with babel
+  on every call,
+- the ``datetime`` filter of dates.py on the datetimes,
+- the labels of dates.format_shows, computed once for the whole list.
+
+    python benchmarks/date_benchmark.py --tiles 10000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+import babel.dates
+import dateutil.parser
+from jinja2 import Environment
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dates  # noqa: E402
+
+TILE = """{% for show in shows %}
+<div class="tile tile-show">
+    <img src="{{ show.artist_image_link }}" alt="Artist Image" />
+    <h4>{{ TIME }}</h4>
+    <h5><a href="/artists/{{ show.artist_id }}">{{ show.artist_name }}</a></h5>
+</div>
+{% endfor %}"""
+
+
+def old_format_datetime(value, format="medium"):
+    date = dateutil.parser.parse(value)
+    if format == "full":
+        format = "EEEE MMMM, d, y 'at' h:mma"
+    elif format == "medium":
+        format = "EE MM, dd, y h:mma"
+    return babel.dates.format_datetime(date, format, locale="en")
+
+
+def make_shows(count, seed=0):
+    rng = random.Random(seed)
+    first_day = datetime(2024, 1, 1)
+    return [
+        {
+            "artist_id": rng.randint(1, 2000),
+            "artist_name": f"Artist {i}",
+            "artist_image_link": f"https://example.com/artist{i}.png",
+            "start_time": first_day.replace(hour=rng.randint(18, 23))
+            + timedelta(days=rng.randint(0, 1095)),
+        }
+        for i in range(count)
+    ]
+
+
+def variants(shows):
+    """``name -> render()`` of the compared ways of formatting the times."""
+    env = Environment(autoescape=True)
+    env.filters["old_datetime"] = old_format_datetime
+    env.filters["datetime"] = dates.format_datetime
+    old = env.from_string(TILE.replace("TIME", "show.start_time|old_datetime('full')"))
+    new = env.from_string(TILE.replace("TIME", "show.start_time|datetime('full')"))
+    bulk = env.from_string(TILE.replace("TIME", "show.start_time_label"))
+    old_shows = [dict(show, start_time=str(show["start_time"])) for show in shows]
+
+    def render_bulk():
+        return bulk.render(shows=dates.format_shows([dict(s) for s in shows]))
+
+    return {
+        "old filter": lambda: old.render(shows=old_shows),
+        "datetime filter": lambda: new.render(shows=shows),
+        "format_shows": render_bulk,
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tiles", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    shows = make_shows(args.tiles)
+    renders = variants(shows)
+    pages = {name: render() for name, render in renders.items()}  # warm up
+    if len(set(pages.values())) != 1:
+        raise SystemExit("the formatters render different pages")
+
+    print(f"{args.tiles} tiles, median of {args.repeat} renders")
+    print(f"{'formatter':<16} {'ms':>9} {'us/tile':>8}")
+    for name, render in renders.items():
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        print(f"{name:<16} {median * 1000:>9.1f} {median / args.tiles * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,102 @@
+"""Import time of the app, per module, from `python -X importtime`.
+
+Each run is a fresh process importing a module of the app (`app` by
+default) under `-X importtime`; the report is the median total and the
+modules with the largest cumulative import time, and whether any of the
+dependencies that are meant to load on first use was imported at startup:
+
+    python benchmarks/import_benchmark.py --repeat 5 --top 25
+    python benchmarks/import_benchmark.py --module asgi
+
+Runs against a copy of the generated small database (see route_benchmark.py).
+"""
+
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+from route_benchmark import DATA_DIR, ROOT, database_for
+
+# imported inside the code paths that need them (forms, `flask db`, the
+# debug toolbar, date formatting), never by `import app`
+LAZY = [
+    "flask_migrate",
+    "alembic",
+    "flask_debugtoolbar",
+    "wtforms",
+    "babel",
+    "dateutil",
+]
+
+# import time:       self [us] |  cumulative | imported package
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_times(module, env):
+    """``{name: (self us, cumulative us, depth)}`` of one import of ``module``."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    times = {}
+    for line in completed.stderr.decode().splitlines():
+        match = LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            times[name] = (int(own), int(cumulative), len(indent) // 2)
+    return times
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app", help="Module to import.")
+    parser.add_argument("--repeat", type=int, default=5, help="Processes.")
+    parser.add_argument("--top", type=int, default=20, help="Modules to list.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "fyyur.sqlite")
+        shutil.copyfile(database_for("small", args.data_dir), database)
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}")
+        runs = [import_times(args.module, env) for _ in range(args.repeat)]
+
+    cumulative = defaultdict(list)
+    own = defaultdict(list)
+    for times in runs:
+        for name, (self_us, cumulative_us, depth) in times.items():
+            own[name].append(self_us)
+            cumulative[name].append(cumulative_us)
+    total = statistics.median(
+        sum(self_us for self_us, _, _ in times.values()) for times in runs
+    )
+    print(f"import {args.module}: {total / 1000:.1f} ms, {len(runs[-1])} modules")
+    print()
+    print(f"{'module':<40} {'self ms':>8} {'cumulative ms':>14}")
+    medians = {name: statistics.median(values) for name, values in cumulative.items()}
+    for name in sorted(medians, key=medians.get, reverse=True)[: args.top]:
+        print(
+            f"{name:<40} {statistics.median(own[name]) / 1000:>8.1f} "
+            f"{medians[name] / 1000:>14.1f}"
+        )
+
+    eager = [name for name in LAZY if name in runs[-1]]
+    print()
+    if eager:
+        print("imported at startup: " + ", ".join(eager))
+        raise SystemExit(1)
+    print("not imported at startup: " + ", ".join(LAZY))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
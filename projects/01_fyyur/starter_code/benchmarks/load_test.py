@@ -0,0 +1,341 @@
+"""Load test: many concurrent users browsing and searching a local server.
+
+Every virtual user is a thread with its own keep-alive connection that
+repeatedly picks a request from a weighted mix (listings, venue and artist
+pages, searches, create forms), then waits a random think time. At the end
+throughput, latency percentiles and error rates are reported per route, for
+the requests started once every user is running; the requests of the ramp-up
+are only counted:
+
+    python benchmarks/load_test.py --users 200 --duration 60
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --users 50
+
+Without --url the app is started against a copy of the generated benchmark
+database of --size (see route_benchmark.py), so it runs fully offline.
+--server picks how: the Flask development server, gunicorn or uvicorn (the
+ASGI entry point), with --workers processes for the last two.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+
+from asgi_benchmark import free_port, percentile, server_command, wait_until_up
+from route_benchmark import DATA_DIR, ROOT, database_for
+
+SEARCH_TERMS = ["music", "hop", "jazz", "band", "the", "club", "echo", "hall"]
+
+# (route name, weight, request factory): the share of each kind of page
+# roughly follows what visitors of a listings site do
+MIX = [
+    ("venues", 14, lambda ids: ("GET", "/venues", None)),
+    ("artists", 10, lambda ids: ("GET", "/artists", None)),
+    ("shows", 12, lambda ids: ("GET", "/shows", None)),
+    ("show_venue", 18, lambda ids: ("GET", f"/venues/{ids.venue()}", None)),
+    ("show_artist", 18, lambda ids: ("GET", f"/artists/{ids.artist()}", None)),
+    (
+        "search_venues",
+        8,
+        lambda ids: ("POST", "/venues/search", {"search_term": ids.term()}),
+    ),
+    (
+        "search_artists",
+        6,
+        lambda ids: ("POST", "/artists/search", {"search_term": ids.term()}),
+    ),
+    (
+        "search_suggest",
+        8,
+        lambda ids: ("GET", f"/api/search/suggest?q={ids.term()}", None),
+    ),
+    ("create_venue_form", 2, lambda ids: ("GET", "/venues/create", None)),
+    ("create_artist_form", 2, lambda ids: ("GET", "/artists/create", None)),
+    ("create_shows", 2, lambda ids: ("GET", "/shows/create", None)),
+]
+# only with --writes: a user listing a show now and then
+WRITE_MIX = [
+    (
+        "create_show_submission",
+        1,
+        lambda ids: (
+            "POST",
+            "/shows/create",
+            {
+                "artist_id": ids.artist(),
+                "venue_id": ids.venue(),
+                "start_time": "2030-01-01 20:00:00",
+            },
+        ),
+    ),
+]
+
+
+class Ids:
+    """Venue and artist ids known to the server, picked at random."""
+
+    def __init__(self, venues, artists, rng):
+        self.venues = venues
+        self.artists = artists
+        self.rng = rng
+
+    def venue(self):
+        return self.rng.choice(self.venues)
+
+    def artist(self):
+        return self.rng.choice(self.artists)
+
+    def term(self):
+        return self.rng.choice(SEARCH_TERMS)
+
+
+def fetch_ids(base_url, resource, pages=5):
+    """Ids of the first ``pages`` pages of the /api/v1 listing."""
+    ids = []
+    url = f"{base_url}/api/v1/{resource}?fields=id&limit=200"
+    cursor = None
+    for _ in range(pages):
+        page_url = url + (f"&after={cursor}" if cursor else "")
+        connection, path = _connect(page_url)
+        connection.request("GET", path)
+        page = json.loads(connection.getresponse().read())
+        connection.close()
+        ids += [item["id"] for item in page["data"]]
+        cursor = page["next"]
+        if not cursor:
+            break
+    if not ids:
+        raise RuntimeError(f"no {resource} on {base_url}, seed the database first")
+    return ids
+
+
+def _connect(url):
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    return http.client.HTTPConnection(parts.hostname, parts.port, timeout=60), path
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        # set when the last user starts
+        self.window_start = float("inf")
+        self.ramp_up_requests = 0
+        self.ramp_up_errors = 0
+
+    def record(self, route, started, seconds, ok):
+        with self.lock:
+            if started < self.window_start:
+                self.ramp_up_requests += 1
+                self.ramp_up_errors += not ok
+            elif ok:
+                self.latencies[route].append(seconds)
+            else:
+                self.errors[route] += 1
+
+
+def user(base_url, mix, venues, artists, stats, stop, think, seed):
+    rng = random.Random(seed)
+    ids = Ids(venues, artists, rng)
+    names = [name for name, _, _ in mix]
+    cum_weights = list(itertools.accumulate(weight for _, weight, _ in mix))
+    factories = {name: factory for name, _, factory in mix}
+    connection, _ = _connect(base_url)
+    while time.monotonic() < stop:
+        route = rng.choices(names, cum_weights=cum_weights)[0]
+        method, path, data = factories[route](ids)
+        body = urllib.parse.urlencode(data) if data else None
+        headers = {"Content-Type": "application/x-www-form-urlencoded"} if data else {}
+        started = time.monotonic()
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            ok = response.status < 400
+            if response.getheader("Connection", "").lower() == "close":
+                connection.close()
+        except (OSError, http.client.HTTPException):
+            ok = False
+            connection.close()
+        stats.record(route, started, time.perf_counter() - start, ok)
+        if think:
+            time.sleep(rng.expovariate(1 / think))
+
+
+def run_load(base_url, args):
+    mix = MIX + (WRITE_MIX if args.writes else [])
+    venues = fetch_ids(base_url, "venues")
+    artists = fetch_ids(base_url, "artists")
+    stats = Stats()
+    started = time.monotonic()
+    stop = started + args.ramp_up + args.duration
+    threads = []
+    for number in range(args.users):
+        thread = threading.Thread(
+            target=user,
+            args=(
+                base_url,
+                mix,
+                venues,
+                artists,
+                stats,
+                stop,
+                args.think,
+                args.seed + number,
+            ),
+            daemon=True,
+        )
+        thread.start()
+        threads.append(thread)
+        # spread the arrivals over the ramp-up
+        time.sleep(args.ramp_up / args.users)
+    stats.window_start = time.monotonic()
+    ramp_up = stats.window_start - started
+    for thread in threads:
+        thread.join()
+    return stats, ramp_up, time.monotonic() - stats.window_start
+
+
+def report(stats, ramp_up, elapsed):
+    rows = {}
+    routes = sorted(set(stats.latencies) | set(stats.errors))
+    all_latencies = []
+    total_errors = 0
+    for route in routes:
+        latencies = stats.latencies.get(route, [])
+        errors = stats.errors.get(route, 0)
+        all_latencies += latencies
+        total_errors += errors
+        rows[route] = _summary(latencies, errors, elapsed)
+    rows["total"] = _summary(all_latencies, total_errors, elapsed)
+    print(
+        f"{'route':<24} {'requests':>8} {'req/s':>8} {'errors':>7} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+    for route, row in rows.items():
+        print(
+            f"{route:<24} {row['requests']:>8} {row['rps']:>8.1f} "
+            f"{row['error_rate']:>7.1%} {row['p50_ms']:>8.1f} "
+            f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}"
+        )
+    print(
+        f"ramp-up: {stats.ramp_up_requests} requests "
+        f"({stats.ramp_up_errors} errors) in {ramp_up:.1f}s, not included above"
+    )
+    return rows
+
+
+def _summary(latencies, errors, elapsed):
+    requests = len(latencies) + errors
+    summary = {
+        "requests": requests,
+        "rps": requests / elapsed,
+        "errors": errors,
+        "error_rate": errors / requests if requests else 0.0,
+    }
+    for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+        summary[f"{name}_ms"] = (
+            percentile(latencies, fraction) * 1000 if latencies else 0.0
+        )
+    summary["max_ms"] = max(latencies) * 1000 if latencies else 0.0
+    return summary
+
+
+def serve(args, tmp):
+    copy = os.path.join(tmp, "fyyur.sqlite")
+    shutil.copyfile(database_for(args.size, args.data_dir), copy)
+    port = free_port()
+    if args.server == "flask":
+        command = [
+            sys.executable,
+            "-m",
+            "flask",
+            "--app",
+            "app",
+            "run",
+            "--port",
+            str(port),
+            "--no-reload",
+            "--no-debugger",
+            "--with-threads",
+        ]
+    else:
+        kind, target = (
+            ("wsgi", "app:app")
+            if args.server == "gunicorn"
+            else ("asgi", "asgi:application")
+        )
+        command = server_command(kind, target, args.workers, port)
+    # a cache of its own, the pages of another database must not be served
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{copy}",
+        PAGE_CACHE_DIR=os.path.join(tmp, "page_cache"),
+    )
+    if args.no_cache:
+        env["PAGE_CACHE_BACKEND"] = "null"
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    wait_until_up(base_url)
+    return server, base_url
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Server to test, default: start one.")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds.")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Seconds.")
+    parser.add_argument(
+        "--think", type=float, default=1.0, help="Mean think time in seconds."
+    )
+    parser.add_argument("--writes", action="store_true", help="Also create shows.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the report to this file.")
+    parser.add_argument(
+        "--server", choices=("flask", "gunicorn", "uvicorn"), default="gunicorn"
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--size", choices=("small", "medium", "large"), default="small")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Disable the page cache."
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        base_url = args.url
+        if base_url is None:
+            server, base_url = serve(args, tmp)
+        try:
+            print(
+                f"{args.users} users for {args.duration:g}s "
+                f"(+{args.ramp_up:g}s ramp-up) against {base_url}"
+            )
+            stats, ramp_up, elapsed = run_load(base_url.rstrip("/"), args)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+    rows = report(stats, ramp_up, elapsed)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,344 @@
+"""Time every route of the app at several data sizes.
+
+For each size of seed_data.SIZES a SQLite database is generated once (kept
+in instance/benchmarks) and copied for the run, so that the write routes do
+not change it. Every route is requested --repeat times with the Flask test
+client, page cache disabled, in a fresh process per size. The median/p95
+times and the queries per request (from the Server-Timing header) are
+written as JSON, by default to benchmarks/results/<commit>.json:
+
+    python benchmarks/route_benchmark.py --sizes small medium
+    python benchmarks/route_benchmark.py --compare benchmarks/results/abc1234.json
+
+--compare prints the change of every route against an earlier result file;
+with --results it compares two files without running anything.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATA_DIR = os.path.join(ROOT, "instance", "benchmarks")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# a change of the median beyond this ratio is flagged by --compare
+THRESHOLD = 0.10
+
+VENUE_FORM = {
+    "name": "Benchmark Venue",
+    "city": "San Francisco",
+    "state": "CA",
+    "address": "1015 Folsom Street",
+    "phone": "123-123-1234",
+    "genres": ["Jazz", "Folk"],
+    "image_link": "https://example.com/venue.png",
+    "facebook_link": "https://www.facebook.com/benchmark",
+    "website_link": "https://example.com",
+    "seeking_talent": "y",
+    "seeking_description": "Looking for jazz acts.",
+}
+ARTIST_FORM = {
+    "name": "Benchmark Artist",
+    "city": "San Francisco",
+    "state": "CA",
+    "phone": "123-123-1234",
+    "genres": ["Jazz"],
+    "image_link": "https://example.com/artist.png",
+    "facebook_link": "https://www.facebook.com/benchmark",
+    "website_link": "https://example.com",
+    "seeking_venue": "y",
+    "seeking_description": "Looking for venues.",
+}
+
+# endpoints that are not timed, and why
+SKIPPED = {
+    "static": "static files",
+    "venues.delete_venue": "destructive",
+}
+
+
+def route_requests(venue_id, artist_id):
+    """``endpoint -> (method, path, form data)`` of the timed requests.
+
+    The venue and artist pages are those of the busiest venue and artist.
+    """
+    return {
+        "main.index": ("GET", "/", None),
+        "main.search_suggest": ("GET", "/api/search/suggest?q=mus", None),
+        "venues.venues": ("GET", "/venues", None),
+        "venues.search_venues": ("POST", "/venues/search", {"search_term": "Musical"}),
+        "venues.show_venue": ("GET", f"/venues/{venue_id}", None),
+        "venues.create_venue_form": ("GET", "/venues/create", None),
+        "venues.create_venue_submission": ("POST", "/venues/create", VENUE_FORM),
+        "artists.artists": ("GET", "/artists", None),
+        "artists.search_artists": ("POST", "/artists/search", {"search_term": "Band"}),
+        "artists.show_artist": ("GET", f"/artists/{artist_id}", None),
+        "artists.edit_artist": ("GET", f"/artists/{artist_id}/edit", None),
+        "artists.edit_artist_submission": (
+            "POST",
+            f"/artists/{artist_id}/edit",
+            ARTIST_FORM,
+        ),
+        "venues.edit_venue": ("GET", f"/venues/{venue_id}/edit", None),
+        "venues.edit_venue_submission": (
+            "POST",
+            f"/venues/{venue_id}/edit",
+            VENUE_FORM,
+        ),
+        "artists.create_artist_form": ("GET", "/artists/create", None),
+        "artists.create_artist_submission": ("POST", "/artists/create", ARTIST_FORM),
+        "shows.shows": ("GET", "/shows", None),
+        "shows.create_shows": ("GET", "/shows/create", None),
+        "shows.create_show_submission": (
+            "POST",
+            "/shows/create",
+            {
+                "artist_id": artist_id,
+                "venue_id": venue_id,
+                "start_time": "2030-01-01 20:00:00",
+            },
+        ),
+        "main.export_entity": ("GET", "/export/venues.csv", None),
+        "main.cache_stats": ("GET", "/cache/stats", None),
+        "main.db_pool_stats": ("GET", "/db/pool", None),
+        "api_v1.list_resource": ("GET", "/api/v1/venues", None),
+        "api_v1.get_resource": ("GET", f"/api/v1/venues/{venue_id}", None),
+    }
+
+
+def percentile(values, fraction):
+    return sorted(values)[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def query_count(response):
+    match = re.search(r'desc="(\d+) quer', response.headers.get("Server-Timing", ""))
+    return int(match.group(1)) if match else None
+
+
+#  Child processes (DATABASE_URL is read when the app is imported)
+#  ----------------------------------------------------------------
+
+
+def generate_database(size):
+    from app import app
+    from models import db
+    import search
+    import seed_data
+
+    with app.app_context():
+        db.create_all()
+        search.build_sqlite_index()
+        seed_data.generate(**seed_data.SIZES[size])
+
+
+def time_routes(repeat):
+    from sqlalchemy import func, select
+
+    from app import app
+    from models import Show, db
+
+    with app.app_context():
+        venue_id, artist_id = (
+            db.session.scalar(
+                select(column).group_by(column).order_by(func.count().desc()).limit(1)
+            )
+            for column in (Show.venue_id, Show.artist_id)
+        )
+    requests = route_requests(venue_id, artist_id)
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint not in requests and not (
+            rule.endpoint in SKIPPED or rule.endpoint.startswith("_debug_toolbar")
+        ):
+            print(f"no benchmark request for {rule.endpoint}", file=sys.stderr)
+
+    client = app.test_client()
+
+    def request(method, path, data):
+        # read streamed bodies (exports) inside the timing
+        response = client.open(path, method=method, data=data)
+        response.get_data()
+        response.close()
+        return response
+
+    routes = {}
+    for endpoint, (method, path, data) in requests.items():
+        request(method, path, data)  # warm up
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = request(method, path, data)
+            timings.append(time.perf_counter() - start)
+        routes[endpoint] = {
+            "method": method,
+            "path": path,
+            "status": response.status_code,
+            "queries": query_count(response),
+            "median_ms": statistics.median(timings) * 1000,
+            "p95_ms": percentile(timings, 0.95) * 1000,
+            "min_ms": min(timings) * 1000,
+        }
+    return routes
+
+
+#  Driver
+#  ----------------------------------------------------------------
+
+
+def _child(args, database_url):
+    env = dict(os.environ, DATABASE_URL=database_url, PAGE_CACHE_BACKEND="null")
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *args],
+        env=env,
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+    return result.stdout
+
+
+def database_for(size, data_dir):
+    path = os.path.join(data_dir, f"fyyur-{size}.sqlite")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"generating the {size} database...", file=sys.stderr)
+        partial = path + ".partial"
+        if os.path.exists(partial):
+            os.remove(partial)
+        _child(["--generate", size], f"sqlite:///{partial}")
+        os.replace(partial, path)
+    return path
+
+
+def run(args):
+    results = {
+        "commit": git_commit(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "sizes": {},
+    }
+    targets = (
+        [("custom", args.database_url)]
+        if args.database_url
+        else [(size, None) for size in args.sizes]
+    )
+    for size, database_url in targets:
+        with tempfile.TemporaryDirectory() as tmp:
+            if database_url is None:
+                copy = os.path.join(tmp, "fyyur.sqlite")
+                shutil.copyfile(database_for(size, args.data_dir), copy)
+                database_url = f"sqlite:///{copy}"
+            print(f"timing routes on the {size} database...", file=sys.stderr)
+            output = _child(["--time", str(args.repeat)], database_url)
+        routes = json.loads(output.decode().strip().splitlines()[-1])
+        results["sizes"][size] = routes
+        print_routes(size, routes)
+    return results
+
+
+def git_commit():
+    try:
+        return (
+            subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=ROOT,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                check=True,
+            )
+            .stdout.decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_routes(size, routes):
+    print(f"\n{size}")
+    print(
+        f"{'endpoint':<34} {'status':>6} {'queries':>7} {'median ms':>10} "
+        f"{'p95 ms':>8}"
+    )
+    for endpoint, route in routes.items():
+        print(
+            f"{endpoint:<34} {route['status']:>6} {str(route['queries']):>7} "
+            f"{route['median_ms']:>10.2f} {route['p95_ms']:>8.2f}"
+        )
+
+
+def compare(old, new):
+    print(f"\n{old['commit']} -> {new['commit']} (median ms)")
+    for size, routes in new["sizes"].items():
+        old_routes = old["sizes"].get(size, {})
+        print(f"\n{size}")
+        for endpoint, route in routes.items():
+            before = old_routes.get(endpoint)
+            if before is None:
+                print(f"{endpoint:<34} {'':>10} {route['median_ms']:>10.2f}  new")
+                continue
+            change = route["median_ms"] / before["median_ms"] - 1
+            flag = ""
+            if change > THRESHOLD:
+                flag = "slower"
+            elif change < -THRESHOLD:
+                flag = "faster"
+            if route["queries"] != before["queries"]:
+                flag += f" queries {before['queries']} -> {route['queries']}"
+            print(
+                f"{endpoint:<34} {before['median_ms']:>10.2f} "
+                f"{route['median_ms']:>10.2f} {change:>+8.0%}  {flag}"
+            )
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", nargs="+", choices=("small", "medium", "large"), default=["small"]
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument(
+        "--database-url", help="Time an existing database instead (not copied)."
+    )
+    parser.add_argument("--output", help="Default: benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", help="Earlier result file to compare with.")
+    parser.add_argument("--results", help="Result file to compare, skips the run.")
+    parser.add_argument("--generate", help=argparse.SUPPRESS)
+    parser.add_argument("--time", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        generate_database(args.generate)
+        return
+    if args.time:
+        print(json.dumps(time_routes(args.time)))
+        return
+
+    if args.results:
+        with open(args.results) as f:
+            results = json.load(f)
+    else:
+        results = run(args)
+        output = args.output or os.path.join(RESULTS_DIR, f"{results['commit']}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nresults written to {output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,75 @@
+"""Compare the indexed search backend with the old ilike scan.
+
+Runs against the database configured in config.py, or against a copy of the
+generated benchmark database of --size (see route_benchmark.py):
+
+    python benchmarks/search_benchmark.py --repeat 50 hop "san francisco"
+    python benchmarks/search_benchmark.py --size large
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from route_benchmark import DATA_DIR, database_for
+
+DEFAULT_TERMS = ["hop", "music", "jazz", "san francisco", "a", "band"]
+
+
+def timed(function, *args, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function(*args)
+    return (time.perf_counter() - start) / repeat * 1000, len(result)
+
+
+def run(terms, repeat):
+    # DATABASE_URL is read when the app is imported
+    from app import app
+    from models import Artist, Venue
+    import search
+
+    with app.app_context():
+        print(
+            f"{'model':<8} {'term':<16} {'indexed ms':>11} {'ilike ms':>9} "
+            f"{'hits':>6} {'ilike hits':>10}"
+        )
+        for model in (Venue, Artist):
+            for term in terms:
+                indexed_ms, hits = timed(search._search, model, term, repeat=repeat)
+                ilike_ms, ilike_hits = timed(
+                    search.search_ilike, model, term, repeat=repeat
+                )
+                print(
+                    f"{model.__tablename__:<8} {term:<16} {indexed_ms:>11.2f} "
+                    f"{ilike_ms:>9.2f} {hits:>6} {ilike_hits:>10}"
+                )
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--size",
+        choices=("small", "medium", "large"),
+        help="Generated database to search, default: the configured one.",
+    )
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("terms", nargs="*", default=DEFAULT_TERMS)
+    args = parser.parse_args(argv)
+
+    if args.size is None:
+        run(args.terms, args.repeat)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, "fyyur.sqlite")
+        shutil.copyfile(database_for(args.size, args.data_dir), copy)
+        os.environ["DATABASE_URL"] = f"sqlite:///{copy}"
+        run(args.terms, args.repeat)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
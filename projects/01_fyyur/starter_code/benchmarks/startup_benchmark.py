@@ -0,0 +1,121 @@
+"""Time-to-first-response of every page route, cold and warm.
+
+Each measurement is a fresh process, like a new worker: it imports the app
+and requests one route with the Flask test client. The import time and the
+time of that first request are reported for two states of the Jinja bytecode
+cache:
+
+- cold: an empty cache, every template is compiled on first use,
+- warm: the cache filled by `flask precompile-templates`.
+
+    python benchmarks/startup_benchmark.py --repeat 5
+
+Runs against a copy of the generated small database (see route_benchmark.py)
+with the page cache disabled.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from route_benchmark import DATA_DIR, ROOT, database_for
+
+# the routes rendering a page, which is where the templates matter
+ROUTES = [
+    "/",
+    "/venues",
+    "/artists",
+    "/shows",
+    "/venues/1",
+    "/artists/1",
+    "/venues/create",
+    "/artists/create",
+    "/shows/create",
+    "/venues/1/edit",
+    "/artists/1/edit",
+    "/nowhere",
+]
+
+
+def first_response(path):
+    """Child process: import the app, request ``path`` once."""
+    started = time.perf_counter()
+    from app import app
+
+    imported = time.perf_counter()
+    response = app.test_client().get(path)
+    response.get_data()
+    done = time.perf_counter()
+    return {
+        "status": response.status_code,
+        "import_ms": (imported - started) * 1000,
+        "first_ms": (done - imported) * 1000,
+    }
+
+
+def _run(command, env):
+    return subprocess.run(
+        command, cwd=ROOT, env=env, stdout=subprocess.PIPE, check=True
+    ).stdout.decode()
+
+
+def measure(path, env, repeat, cache_dir, cold):
+    runs = []
+    for _ in range(repeat):
+        if cold:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        output = _run([sys.executable, os.path.abspath(__file__), "--child", path], env)
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "status": runs[-1]["status"],
+        "import_ms": statistics.median(run["import_ms"] for run in runs),
+        "first_ms": statistics.median(run["first_ms"] for run in runs),
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="Processes per route.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("routes", nargs="*", default=ROUTES)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(first_response(args.child)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "fyyur.sqlite")
+        shutil.copyfile(database_for("small", args.data_dir), database)
+        cache_dir = os.path.join(tmp, "jinja_cache")
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{database}",
+            PAGE_CACHE_BACKEND="null",
+            JINJA_BYTECODE_CACHE_DIR=cache_dir,
+        )
+        print(
+            f"{'route':<18} {'status':>6} {'import ms':>10} "
+            f"{'cold ms':>8} {'warm ms':>8} {'saved':>6}"
+        )
+        for path in args.routes:
+            cold = measure(path, env, args.repeat, cache_dir, cold=True)
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            _run([sys.executable, "-m", "flask", "precompile-templates"], env)
+            warm = measure(path, env, args.repeat, cache_dir, cold=False)
+            saved = 1 - warm["first_ms"] / cold["first_ms"]
+            print(
+                f"{path:<18} {warm['status']:>6} {warm['import_ms']:>10.1f} "
+                f"{cold['first_ms']:>8.1f} {warm['first_ms']:>8.1f} {saved:>6.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
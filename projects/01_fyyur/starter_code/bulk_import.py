@@ -0,0 +1,344 @@
+# ----------------------------------------------------------------------------#
+# Bulk import of venues, artists and shows (``flask import``).
+#
+# Rows are streamed from CSV, JSON or NDJSON files, validated with the forms
+# of forms.py and inserted in batched transactions: one executemany INSERT
+# per batch, or COPY for shows on Postgres/psycopg2. Invalid rows are
+# reported and skipped; a batch the database rejects is retried row by row
+# so that only the offending rows are lost.
+# ----------------------------------------------------------------------------#
+import csv
+import io
+import json
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import exists, select
+from werkzeug.datastructures import MultiDict
+
+import counters
+from models import (
+    Artist,
+    Show,
+    Venue,
+    artist_genres,
+    db,
+    genres_by_name,
+    parse_genres,
+    venue_genres,
+)
+
+FORMATS = ("csv", "json", "ndjson")
+
+VENUE_COLUMNS = (
+    "name",
+    "city",
+    "state",
+    "address",
+    "phone",
+    "image_link",
+    "facebook_link",
+    "website_link",
+    "seeking_talent",
+    "seeking_description",
+)
+ARTIST_COLUMNS = (
+    "name",
+    "city",
+    "state",
+    "phone",
+    "image_link",
+    "facebook_link",
+    "website_link",
+    "seeking_venue",
+    "seeking_description",
+)
+
+
+class RowError(Exception):
+    pass
+
+
+def read_rows(path, format=None):
+    """Yield ``(line_number, row dict)`` from a CSV, JSON or NDJSON file.
+
+    An NDJSON line that does not parse is yielded as a :class:`RowError`, so
+    that it is reported like the other invalid rows.
+    """
+    format = format or os.path.splitext(path)[1].lstrip(".").lower()
+    if format == "jsonl":
+        format = "ndjson"
+    if format not in FORMATS:
+        raise ValueError(f"Unknown import format {format!r}")
+    with open(path, newline="" if format == "csv" else None) as f:
+        if format == "csv":
+            # line 1 is the header
+            for number, row in enumerate(csv.DictReader(f), start=2):
+                yield number, row
+        elif format == "ndjson":
+            for number, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield number, json.loads(line)
+                    except ValueError as e:
+                        yield number, RowError(f"invalid JSON: {e}")
+        else:
+            for number, row in enumerate(json.load(f), start=1):
+                yield number, row
+
+
+def _formdata(row):
+    data = MultiDict()
+    for key, value in row.items():
+        if value is None:
+            continue
+        if key == "genres":
+            names = value if isinstance(value, list) else parse_genres(value)
+            for name in names:
+                data.add(key, name)
+        elif isinstance(value, bool):
+            data.add(key, "y" if value else "")
+        else:
+            data.add(key, str(value))
+    return data
+
+
+def _validate(form_class, row):
+    form = form_class(formdata=_formdata(row), meta={"csrf": False})
+    try:
+        valid = form.validate()
+    except (TypeError, ValueError) as e:
+        # a validator choking on the row must not stop the whole import
+        raise RowError(str(e))
+    if not valid:
+        raise RowError(
+            "; ".join(
+                f"{field}: {', '.join(errors)}" for field, errors in form.errors.items()
+            )
+        )
+    return form.data
+
+
+def _venue_values(row):
+    from forms import VenueForm
+
+    data = _validate(VenueForm, row)
+    values = {column: data.get(column) for column in VENUE_COLUMNS}
+    values["seeking_talent"] = bool(values["seeking_talent"])
+    values["genres"] = ",".join(data["genres"])
+    return values
+
+
+def _artist_values(row):
+    from forms import ArtistForm
+
+    data = _validate(ArtistForm, row)
+    values = {column: data.get(column) for column in ARTIST_COLUMNS}
+    values["seeking_venue"] = bool(values["seeking_venue"])
+    values["seeking_description"] = values["seeking_description"] or ""
+    values["genres"] = ",".join(data["genres"])
+    return values
+
+
+def _show_values(row):
+    start_time = row.get("start_time")
+    if not start_time:
+        raise RowError("start_time: This field is required.")
+    # ISO 8601, with a space or a "T" between the date and the time
+    try:
+        values = {"start_time": datetime.fromisoformat(str(start_time).strip())}
+    except ValueError:
+        raise RowError(f"start_time: not an ISO 8601 date and time: {start_time!r}")
+    for kind in ("artist", "venue"):
+        if row.get(f"{kind}_id") not in (None, ""):
+            try:
+                values[f"{kind}_id"] = int(row[f"{kind}_id"])
+            except (TypeError, ValueError):
+                raise RowError(f"{kind}_id: not an integer")
+        elif row.get(f"{kind}_name"):
+            values[f"{kind}_name"] = row[f"{kind}_name"]
+        else:
+            raise RowError(f"{kind}_id or {kind}_name is required")
+    return values
+
+
+def _resolve_shows(batch):
+    """Replace artist/venue names and check ids with two lookups per kind.
+
+    Unresolved rows are removed from ``batch`` and returned with their error.
+    """
+    errors = []
+    for kind, model in (("artist", Artist), ("venue", Venue)):
+        names = {
+            values[f"{kind}_name"] for _, values in batch if f"{kind}_name" in values
+        }
+        ids = {values[f"{kind}_id"] for _, values in batch if f"{kind}_id" in values}
+        by_name = {}
+        if names:
+            for id, name in db.session.query(model.id, model.name).filter(
+                model.name.in_(names)
+            ):
+                # a name used by two rows cannot be resolved
+                by_name[name] = None if name in by_name else id
+        known_ids = set()
+        if ids:
+            known_ids = {
+                id for id, in db.session.query(model.id).filter(model.id.in_(ids))
+            }
+        resolved = []
+        for number, values in batch:
+            if f"{kind}_name" in values:
+                name = values.pop(f"{kind}_name")
+                if by_name.get(name) is None:
+                    reason = "is ambiguous" if name in by_name else "not found"
+                    errors.append((number, f"{kind} {name!r} {reason}"))
+                    continue
+                values[f"{kind}_id"] = by_name[name]
+            elif values[f"{kind}_id"] not in known_ids:
+                errors.append((number, f"{kind} id {values[f'{kind}_id']} not found"))
+                continue
+            resolved.append((number, values))
+        batch[:] = resolved
+    return errors
+
+
+def _copy_shows(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for values in rows:
+        writer.writerow(
+            (values["start_time"].isoformat(), values["artist_id"], values["venue_id"])
+        )
+    buffer.seek(0)
+    dbapi_connection = db.session.connection().connection
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(
+            "COPY shows (start_time, artist_id, venue_id) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def _use_copy(table):
+    engine = db.engine
+    return (
+        table is Show.__table__
+        and engine.dialect.name == "postgresql"
+        and engine.dialect.driver == "psycopg2"
+    )
+
+
+def insert_rows(table, rows):
+    """Insert ``rows`` (dicts) into ``table``, with COPY when possible."""
+    if _use_copy(table):
+        _copy_shows(rows)
+    else:
+        db.session.execute(table.insert(), rows)
+
+
+def link_genres(model, link_table, owner_column, first_id):
+    """Create the genre links of the rows inserted after ``first_id``."""
+    owner_fk = link_table.c[owner_column]
+    rows = db.session.execute(
+        select(model.id, model.genres).where(
+            model.id > first_id, ~exists().where(owner_fk == model.id)
+        )
+    ).fetchall()
+    genres = {
+        g.name: g for g in genres_by_name(n for _, v in rows for n in parse_genres(v))
+    }
+    db.session.flush()
+    links = [
+        {owner_column: id, "genre_id": genres[name].id}
+        for id, value in rows
+        for name in dict.fromkeys(parse_genres(value))
+    ]
+    if links:
+        db.session.execute(link_table.insert(), links)
+
+
+ENTITIES = {
+    "venues": (Venue, _venue_values, (venue_genres, "venue_id")),
+    "artists": (Artist, _artist_values, (artist_genres, "artist_id")),
+    "shows": (Show, _show_values, None),
+}
+
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.inserted / self.elapsed if self.elapsed else 0.0
+
+
+def import_file(entity, path, format=None, batch_size=1000, on_error=None):
+    """Import ``path`` into ``entity`` ("venues", "artists" or "shows")."""
+    model, to_values, genre_link = ENTITIES[entity]
+    report = ImportReport()
+
+    def error(number, message):
+        report.errors.append((number, message))
+        if on_error is not None:
+            on_error(number, message)
+
+    batch = []
+    for number, row in read_rows(path, format):
+        try:
+            if isinstance(row, RowError):
+                raise row
+            if not isinstance(row, dict):
+                raise RowError(f"not an object: {row!r}")
+            batch.append((number, to_values(row)))
+        except RowError as e:
+            error(number, str(e))
+        if len(batch) >= batch_size:
+            _flush(model, genre_link, batch, report, error)
+            batch = []
+    if batch:
+        _flush(model, genre_link, batch, report, error)
+    return report
+
+
+def _flush(model, genre_link, batch, report, error):
+    if model is Show:
+        for number, message in _resolve_shows(batch):
+            error(number, message)
+    if not batch:
+        return
+    try:
+        _write_batch(model, genre_link, [values for _, values in batch])
+        report.inserted += len(batch)
+    except Exception:
+        db.session.rollback()
+        # isolate the rows the database rejects
+        for number, values in batch:
+            try:
+                _write_batch(model, genre_link, [values])
+                report.inserted += 1
+            except Exception as e:
+                db.session.rollback()
+                error(number, str(getattr(e, "orig", e)).strip())
+
+
+def _write_batch(model, genre_link, rows):
+    first_id = None
+    if genre_link is not None:
+        first_id = db.session.query(db.func.coalesce(db.func.max(model.id), 0)).scalar()
+    insert_rows(model.__table__, rows)
+    if genre_link is not None:
+        link_genres(model, *genre_link, first_id)
+    if model is Show:
+        # COPY/executemany bypass the ORM events that maintain the counters
+        for owner, owner_fk in counters.OWNERS:
+            column = owner_fk.key
+            ids = {values[column] for values in rows}
+            db.session.execute(counters.recount(owner, owner_fk, ids))
+    db.session.commit()
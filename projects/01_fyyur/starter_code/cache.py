@@ -0,0 +1,305 @@
+# ----------------------------------------------------------------------------#
+# Rendered-page cache for the read views.
+#
+# Pages are stored under a key built from the request path, its query string
+# and the current version of every tag the page depends on ("venues",
+# "artist:3", ...). The write views bump the versions of the tags they
+# affect, so the stale pages are simply never looked up again and age out of
+# the backend. Entries also expire after PAGE_CACHE_TIMEOUT seconds, since
+# shows move from upcoming to past without any write.
+#
+# A tag's version is the time of its last bump, in nanoseconds. A page read
+# from a replica (see replicas.py) less than REPLICA_STICKY_SECONDS after a
+# bump of one of its tags may predate that write, so it is served but not
+# stored.
+#
+# The default "filesystem" backend is shared by the web workers and the CLI
+# commands of a host, so a write anywhere invalidates the pages everywhere.
+# "lru" keeps the pages in each process: fine for a single worker, but then
+# the invalidations of a write only reach the process that made it.
+# ----------------------------------------------------------------------------#
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from flask import request, session
+
+from replicas import reading_replica
+
+
+def _next_version(version):
+    return max(version + 1, time.time_ns())
+
+
+class NullBackend:
+    shared = True
+
+    def get(self, key):
+        return None
+
+    def version(self, tag):
+        return 0
+
+    def bump(self, tag):
+        pass
+
+    def set(self, key, value):
+        pass
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class LRUBackend:
+    """In-process cache keeping the ``max_entries`` most recently used pages."""
+
+    shared = False
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def version(self, tag):
+        return self._versions.get(tag, 0)
+
+    def bump(self, tag):
+        with self._lock:
+            self._versions[tag] = _next_version(self._versions.get(tag, 0))
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class FileSystemBackend:
+    """Cache shared by all the workers of a host, one pickle file per entry.
+
+    Every ``prune_every`` writes of a process, if more than ``max_entries``
+    files exist, the least recently written tenth of them is removed. Tag
+    versions live in a separate directory that is never pruned.
+    """
+
+    shared = True
+
+    def __init__(self, directory, max_entries=5000, prune_every=100):
+        self.directory = directory
+        self.tags_directory = os.path.join(directory, "tags")
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self.evictions = 0
+        self._writes = 0
+        os.makedirs(self.tags_directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.PickleError):
+            return None
+
+    def _write(self, path, value):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def set(self, key, value):
+        self._write(self._path(key), value)
+        # listing the directory costs more than the write itself
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self._prune()
+
+    def _tag_path(self, tag):
+        return os.path.join(self.tags_directory, hashlib.sha1(tag.encode()).hexdigest())
+
+    def version(self, tag):
+        try:
+            with open(self._tag_path(tag), "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.PickleError):
+            return 0
+
+    def bump(self, tag):
+        self._write(self._tag_path(tag), _next_version(self.version(tag)))
+
+    def _entries(self):
+        return [
+            e
+            for e in os.scandir(self.directory)
+            if e.is_file() and not e.name.endswith(".tmp")
+        ]
+
+    def _prune(self):
+        entries = self._entries()
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[: max(1, len(entries) // 10)]:
+            try:
+                os.remove(entry.path)
+                self.evictions += 1
+            except OSError:
+                pass
+
+    def clear(self):
+        for entry in self._entries():
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._entries())
+
+
+class PageCache:
+    def __init__(self, app=None):
+        self.backend = NullBackend()
+        self.timeout = 300
+        self.replica_lag = 5
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        kind = app.config.get("PAGE_CACHE_BACKEND", "filesystem")
+        max_entries = app.config.get("PAGE_CACHE_MAX_ENTRIES", 512)
+        self.timeout = app.config.get("PAGE_CACHE_TIMEOUT", 300)
+        self.replica_lag = app.config.get("REPLICA_STICKY_SECONDS", 5)
+        self.hits = self.misses = 0
+        if kind == "lru":
+            self.backend = LRUBackend(max_entries)
+        elif kind == "filesystem":
+            directory = app.config.get("PAGE_CACHE_DIR") or os.path.join(
+                app.instance_path, "page_cache"
+            )
+            self.backend = FileSystemBackend(directory, max_entries)
+        elif kind in (None, "null"):
+            self.backend = NullBackend()
+        else:
+            raise ValueError(f"Unknown PAGE_CACHE_BACKEND {kind!r}")
+        app.extensions["page_cache"] = self
+
+    def invalidate(self, *tags):
+        """Drop every cached page depending on one of ``tags``.
+
+        With a per-process backend only the pages of this process are
+        dropped; ``shared`` tells whether the other processes see it.
+        """
+        for tag in tags:
+            self.backend.bump(tag)
+
+    @property
+    def shared(self):
+        return self.backend.shared
+
+    def bypass(self):
+        # a pending flash message would end up in (or be lost from) the
+        # cached page
+        return request.method != "GET" or "_flashes" in session
+
+    def settling(self, tags):
+        """Whether the replica read by this request may lag behind ``tags``."""
+        if reading_replica() is None:
+            return False
+        since = time.time_ns() - int(self.replica_lag * 1e9)
+        return any(self.backend.version(tag) > since for tag in tags)
+
+    def key(self, tags):
+        """Cache key of the current request for a page depending on ``tags``."""
+        versions = ",".join(f"{tag}={self.backend.version(tag)}" for tag in tags)
+        return "page:{}?{}|{}".format(
+            request.path,
+            "&".join(sorted(request.query_string.decode().split("&"))),
+            versions,
+        )
+
+    def get(self, key):
+        entry = self.backend.get(key)
+        if entry is not None and entry[0] > time.time():
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def set(self, key, page):
+        if isinstance(page, str):
+            self.backend.set(key, (time.time() + self.timeout, page))
+
+    def store(self, key, page, tags):
+        """Cache ``page`` unless the replica it was read from may be stale."""
+        if not self.settling(tags):
+            self.set(key, page)
+
+    def cached(self, tags):
+        """Cache the page returned by a GET view.
+
+        ``tags`` is called with the view arguments and returns the tags the
+        page depends on.
+        """
+
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(**kwargs):
+                if self.bypass():
+                    return view(**kwargs)
+                page_tags = tags(**kwargs)
+                key = self.key(page_tags)
+                page = self.get(key)
+                if page is None:
+                    page = view(**kwargs)
+                    self.store(key, page, page_tags)
+                return page
+
+            return wrapper
+
+        return decorator
+
+    def stats(self):
+        """The entries of the backend, and the counters of this process only."""
+        return {
+            "backend": type(self.backend).__name__,
+            "shared": self.shared,
+            "entries": len(self.backend),
+            "process": {
+                "pid": os.getpid(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": getattr(self.backend, "evictions", 0),
+            },
+        }
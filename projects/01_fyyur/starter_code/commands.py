@@ -0,0 +1,287 @@
+# ----------------------------------------------------------------------------#
+# flask CLI commands.
+#
+# Registered on the app by a blueprint without a command group, so they are
+# top-level commands (`flask seed`, `flask counters rebuild`, ...). `flask db`
+# is Flask-Migrate's group; alembic takes longer to import than the rest of
+# the app, so it is only imported, and Migrate only set up, when a `flask db`
+# command is run.
+# ----------------------------------------------------------------------------#
+import time
+
+import click
+from flask import Blueprint, current_app, g
+from flask.cli import with_appcontext
+
+import archive
+import bulk_import
+import counters
+import export
+import partitions
+import search
+import seed_data
+import suggest
+import templating
+from extensions import page_cache, replicas, static_assets
+from models import db
+
+blueprint = Blueprint("commands", __name__, cli_group=None)
+
+
+def _invalidate_pages(*tags):
+    """Invalidate the cached pages, warning when the web workers cannot see it."""
+    page_cache.invalidate(*tags)
+    if not page_cache.shared:
+        click.echo(
+            "Warning: the page cache is per process (PAGE_CACHE_BACKEND="
+            f"{current_app.config.get('PAGE_CACHE_BACKEND')}), the web workers "
+            f"serve their cached pages for up to {page_cache.timeout}s.",
+            err=True,
+        )
+
+
+class MigrateGroup(click.Group):
+    """Flask-Migrate's `flask db` commands, loaded when one of them runs."""
+
+    def _group(self):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as db_group
+
+        if "migrate" not in current_app.extensions:
+            Migrate(current_app, db)
+        return db_group
+
+    def list_commands(self, ctx):
+        return self._group().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._group().get_command(ctx, name)
+
+
+@blueprint.cli.group("db", cls=MigrateGroup)
+@click.option(
+    "-d",
+    "--directory",
+    default=None,
+    help='Migration script directory (default is "migrations")',
+)
+@click.option(
+    "-x",
+    "--x-arg",
+    multiple=True,
+    help="Additional arguments consumed by custom env.py scripts",
+)
+@with_appcontext
+def db_cli(directory, x_arg):
+    """Perform database migrations (Flask-Migrate)."""
+    # what flask_migrate.cli.db would set; Migrate.get_config() reads them
+    g.directory = directory
+    g.x_arg = x_arg
+
+
+@blueprint.cli.command("search-index")
+def search_index_command():
+    """Create or rebuild the SQLite FTS5 search tables."""
+    if db.engine.dialect.name != "sqlite":
+        print("Postgres search indexes are created by `flask db upgrade`.")
+        return
+    search.build_sqlite_index()
+    print("Search index rebuilt.")
+
+
+@blueprint.cli.command("sync-replicas")
+def sync_replicas_command():
+    """Copy the SQLite database into the SQLite read replicas."""
+    if db.engine.dialect.name != "sqlite":
+        print("Only SQLite replicas are synced here, use the database's replication.")
+        return
+    for key in replicas.sync_sqlite(db):
+        print(f"{key}: {db.engines[key].url}")
+
+
+@blueprint.cli.command("precompile-templates")
+def precompile_templates_command():
+    """Compile every template into the Jinja bytecode cache."""
+    directory = templating.cache_dir(current_app)
+    if current_app.jinja_env.bytecode_cache is None:
+        print("The Jinja bytecode cache is disabled (JINJA_BYTECODE_CACHE_DIR).")
+        return
+    started = time.perf_counter()
+    names = templating.precompile(current_app.jinja_env)
+    templating.precompile(templating.async_environment(current_app))
+    elapsed = time.perf_counter() - started
+    print(f"Compiled {len(names)} templates into {directory} in {elapsed:.2f}s.")
+
+
+@blueprint.cli.command("build-assets")
+@click.option("--clean", is_flag=True, help="Remove the files of earlier builds.")
+def build_assets_command(clean):
+    """Bundle, fingerprint and precompress the stylesheets and scripts."""
+    manifest = static_assets.build(current_app.static_folder, clean=clean)
+    for name, filename in manifest["bundles"].items():
+        print(f"{name} -> static/dist/{filename}")
+
+
+@blueprint.cli.command("import")
+@click.argument("entity", type=click.Choice(sorted(bulk_import.ENTITIES)))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--format", type=click.Choice(bulk_import.FORMATS), help="Default: file extension."
+)
+@click.option("--batch-size", default=1000, help="Rows per transaction.")
+def import_command(entity, path, format, batch_size):
+    """Bulk import venues, artists or shows from a CSV/JSON/NDJSON file."""
+
+    def report_error(number, message):
+        print(f"{path}:{number}: {message}")
+
+    report = bulk_import.import_file(
+        entity, path, format=format, batch_size=batch_size, on_error=report_error
+    )
+    tags = [entity, "venue-pages", "artist-pages"]
+    if entity != "venues":
+        tags.append("venues")
+    _invalidate_pages(*tags)
+    print(
+        f"{report.inserted} {entity} imported, {len(report.errors)} rejected "
+        f"in {report.elapsed:.1f}s ({report.rows_per_second:.0f} rows/s)."
+    )
+    if entity != "shows":
+        suggest.reload()
+
+
+@blueprint.cli.command("export")
+@click.argument("entity", type=click.Choice(sorted(export.ENTITIES)))
+@click.option("--format", type=click.Choice(export.FORMATS), default="csv")
+@click.option("--output", type=click.File("w"), default="-", help="Default: stdout.")
+@click.option("--start-from", help="Shows starting at or after this ISO date.")
+@click.option("--start-to", help="Shows starting before this ISO date.")
+@click.option("--state", help="Venues or artists in this state.")
+def export_command(entity, format, output, start_from, start_to, state):
+    """Stream venues, artists or shows to a CSV/NDJSON file."""
+    try:
+        statement = export.export_statement(entity, start_from, start_to, state)
+    except export.ExportError as e:
+        raise click.BadParameter(str(e))
+    for chunk in export.generate(statement, format):
+        output.write(chunk)
+
+
+@blueprint.cli.command("seed")
+@click.option(
+    "--size",
+    type=click.Choice(list(seed_data.SIZES)),
+    default="small",
+    help="Preset row counts.",
+)
+@click.option("--venues", type=int, help="Overrides the preset.")
+@click.option("--artists", type=int, help="Overrides the preset.")
+@click.option("--shows", type=int, help="Overrides the preset.")
+@click.option("--seed", default=0, help="Random seed.")
+@click.option("--batch-size", default=5000, help="Rows per transaction.")
+def seed_command(size, venues, artists, shows, seed, batch_size):
+    """Fill the database with synthetic venues, artists and shows."""
+    counts = dict(seed_data.SIZES[size])
+    for name, value in (("venues", venues), ("artists", artists), ("shows", shows)):
+        if value is not None:
+            counts[name] = value
+
+    def progress(table, done, total):
+        print(f"\r{table}: {done}/{total}", end="\n" if done == total else "")
+
+    elapsed = seed_data.generate(
+        seed=seed, batch_size=batch_size, progress=progress, **counts
+    )
+    _invalidate_pages("venues", "artists", "shows", "venue-pages", "artist-pages")
+    suggest.reload()
+    print(f"Seeded in {elapsed:.1f}s.")
+
+
+@blueprint.cli.group("partitions")
+def partitions_cli():
+    """Maintain the monthly partitions of the shows."""
+
+
+@partitions_cli.command("maintain")
+@click.option("--ahead", type=int, help="Default: SHOWS_PARTITION_MONTHS_AHEAD.")
+@click.option("--retain", type=int, help="Default: SHOWS_RETAIN_MONTHS.")
+def partitions_maintain_command(ahead, retain):
+    """Create the coming months' partitions and archive the old months."""
+    if ahead is None:
+        ahead = current_app.config["SHOWS_PARTITION_MONTHS_AHEAD"]
+    if retain is None:
+        retain = current_app.config["SHOWS_RETAIN_MONTHS"]
+    with db.engine.begin() as connection:
+        created, retired = partitions.maintain(connection, ahead, retain)
+    for name in created:
+        print(f"created {name}")
+    for month in retired:
+        print(f"archived {month:%Y-%m}")
+    if retired:
+        _invalidate_pages("shows", "venue-pages", "artist-pages")
+
+
+@partitions_cli.command("list")
+def partitions_list_command():
+    """Row counts of the shows tables and of their partitions."""
+    with db.engine.connect() as connection:
+        for name, rows in partitions.table_sizes(connection):
+            print(f"{name:<24} {rows:>10}")
+
+
+@blueprint.cli.command("archive-shows")
+@click.option("--days", type=int, help="Default: SHOWS_ARCHIVE_AFTER_DAYS.")
+@click.option("--batch-size", default=1000, help="Rows per transaction.")
+def archive_shows_command(days, batch_size):
+    """Move the shows older than the archive horizon to shows_archive."""
+    if days is None:
+        days = current_app.config["SHOWS_ARCHIVE_AFTER_DAYS"]
+    before = archive.horizon(days)
+
+    def progress(moved):
+        print(f"\r{moved} shows archived", end="")
+
+    started = time.perf_counter()
+    months, moved = archive.archive_shows(before, batch_size, progress)
+    if moved:
+        print()
+    for month in months:
+        print(f"archived {month:%Y-%m} (partition)")
+    if months or moved:
+        _invalidate_pages("shows", "venue-pages", "artist-pages")
+    elapsed = time.perf_counter() - started
+    print(f"Shows before {before:%Y-%m-%d %H:%M} archived in {elapsed:.1f}s.")
+
+
+@blueprint.cli.group("counters")
+def counters_cli():
+    """Maintain the upcoming/past show counters."""
+
+
+@counters_cli.command("roll-forward")
+@click.option("--minutes", default=15, help="How far back to look for started shows.")
+def counters_roll_forward_command(minutes):
+    """Move shows that have started from upcoming to past."""
+    updated = counters.roll_forward(minutes)
+    if updated:
+        _invalidate_pages("venues")
+    print(f"{updated} venues/artists recounted.")
+
+
+@counters_cli.command("check")
+def counters_check_command():
+    """Compare the counters with a full recount of the shows."""
+    mismatches = counters.check()
+    for table, id, stored, actual in mismatches:
+        print(f"{table} {id}: stored upcoming/past {stored}, actual {actual}")
+    if mismatches:
+        raise SystemExit(1)
+    print("All counters are consistent.")
+
+
+@counters_cli.command("rebuild")
+def counters_rebuild_command():
+    """Recompute every counter from the shows table."""
+    counters.rebuild()
+    _invalidate_pages("venues")
+    print("Counters rebuilt.")
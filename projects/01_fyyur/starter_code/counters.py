@@ -0,0 +1,171 @@
+# ----------------------------------------------------------------------------#
+# Denormalized upcoming/past show counters on venues and artists.
+#
+# The counters are adjusted in the same transaction as every ORM insert or
+# delete of a Show (including the cascade when a venue or artist is deleted).
+# Shows whose start time passes are moved from upcoming to past by
+# ``flask counters roll-forward``, which should be scheduled more often than
+# its --minutes window (e.g. every 5 minutes with the default 15).
+#
+# Archived shows (shows_archive, see partitions.py) stay counted as past.
+# Deleting a venue or artist deletes its archived shows too, and recounts the
+# artists or venues they were counted for.
+# ----------------------------------------------------------------------------#
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, event, func, select, update
+
+from models import ArchivedShow, Artist, Show, Venue, db
+
+OWNERS = ((Venue, Show.venue_id), (Artist, Show.artist_id))
+
+
+def _now_for(start_time):
+    if start_time is not None and start_time.tzinfo is not None:
+        return datetime.now(timezone.utc)
+    return datetime.now()
+
+
+def is_upcoming(start_time):
+    return start_time is not None and start_time > _now_for(start_time)
+
+
+def _adjust(connection, show, delta):
+    column = (
+        "upcoming_shows_count" if is_upcoming(show.start_time) else "past_shows_count"
+    )
+    for model, owner_id in ((Venue, show.venue_id), (Artist, show.artist_id)):
+        table = model.__table__
+        connection.execute(
+            update(table)
+            .where(table.c.id == owner_id)
+            .values({column: table.c[column] + delta})
+        )
+
+
+@event.listens_for(Show, "after_insert")
+def _show_inserted(mapper, connection, show):
+    _adjust(connection, show, 1)
+
+
+@event.listens_for(Show, "after_delete")
+def _show_deleted(mapper, connection, show):
+    _adjust(connection, show, -1)
+
+
+def _archived(model, owner_fk):
+    """Scalar count of the archived shows of each ``model`` row."""
+    archived_fk = getattr(ArchivedShow, owner_fk.key)
+    return (
+        select(func.count(ArchivedShow.id))
+        .where(archived_fk == model.id)
+        .scalar_subquery()
+    )
+
+
+def recount(model, owner_fk, owner_ids=None):
+    """UPDATE setting the counters of ``model`` rows from a full recount."""
+    now = datetime.now()
+    upcoming = (
+        select(func.count(Show.id))
+        .where(owner_fk == model.id, Show.start_time > now)
+        .scalar_subquery()
+    )
+    past = (
+        select(func.count(Show.id))
+        .where(owner_fk == model.id, Show.start_time <= now)
+        .scalar_subquery()
+    )
+    statement = update(model).values(
+        upcoming_shows_count=upcoming,
+        past_shows_count=past + _archived(model, owner_fk),
+    )
+    if owner_ids is not None:
+        statement = statement.where(model.id.in_(owner_ids))
+    return statement.execution_options(synchronize_session=False)
+
+
+def _drop_archived(connection, owner_fk, owner_id, counterpart, counterpart_fk):
+    archived_owner_fk = getattr(ArchivedShow, owner_fk.key)
+    archived_counterpart_fk = getattr(ArchivedShow, counterpart_fk.key)
+    counterpart_ids = connection.scalars(
+        select(archived_counterpart_fk).where(archived_owner_fk == owner_id).distinct()
+    ).all()
+    if not counterpart_ids:
+        return
+    # explicitly: Postgres would cascade, but SQLite leaves the rows behind
+    connection.execute(delete(ArchivedShow).where(archived_owner_fk == owner_id))
+    connection.execute(recount(counterpart, counterpart_fk, counterpart_ids))
+
+
+# before_delete runs once the owner's shows are deleted (and counted down),
+# but before its row is, which on Postgres cascades to its archived shows
+@event.listens_for(Venue, "before_delete")
+def _venue_deleted(mapper, connection, venue):
+    _drop_archived(connection, Show.venue_id, venue.id, Artist, Show.artist_id)
+
+
+@event.listens_for(Artist, "before_delete")
+def _artist_deleted(mapper, connection, artist):
+    _drop_archived(connection, Show.artist_id, artist.id, Venue, Show.venue_id)
+
+
+def rebuild():
+    """Recompute every counter from the shows table."""
+    for model, owner_fk in OWNERS:
+        db.session.execute(recount(model, owner_fk))
+    db.session.commit()
+
+
+def roll_forward(minutes=15):
+    """Recount the venues and artists with a show that started recently.
+
+    Recounting (instead of decrementing) makes overlapping runs harmless.
+    Returns the number of venues and artists updated.
+    """
+    now = datetime.now()
+    started = (Show.start_time > now - timedelta(minutes=minutes)) & (
+        Show.start_time <= now
+    )
+    updated = 0
+    for model, owner_fk in OWNERS:
+        owner_ids = select(owner_fk).where(started).distinct()
+        updated += db.session.execute(recount(model, owner_fk, owner_ids)).rowcount
+    db.session.commit()
+    return updated
+
+
+def check():
+    """Return ``(kind, id, stored, actual)`` for every counter out of sync."""
+    now = datetime.now()
+    mismatches = []
+    for model, owner_fk in OWNERS:
+        counts = (
+            select(
+                owner_fk.label("owner_id"),
+                func.count(Show.id).filter(Show.start_time > now).label("upcoming"),
+                func.count(Show.id).filter(Show.start_time <= now).label("past"),
+            )
+            .group_by(owner_fk)
+            .subquery()
+        )
+        rows = db.session.execute(
+            select(
+                model.id,
+                model.upcoming_shows_count,
+                model.past_shows_count,
+                func.coalesce(counts.c.upcoming, 0),
+                func.coalesce(counts.c.past, 0) + _archived(model, owner_fk),
+            ).outerjoin(counts, counts.c.owner_id == model.id)
+        )
+        for id, upcoming, past, actual_upcoming, actual_past in rows:
+            if (upcoming, past) != (actual_upcoming, actual_past):
+                mismatches.append(
+                    (
+                        model.__tablename__,
+                        id,
+                        (upcoming, past),
+                        (actual_upcoming, actual_past),
+                    )
+                )
+    return mismatches
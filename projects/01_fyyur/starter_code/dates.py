@@ -0,0 +1,73 @@
+# ----------------------------------------------------------------------------#
+# Date formatting of the templates (the ``datetime`` filter).
+#
+# Values that are already datetimes (what the queries return) are formatted
+# as is; only strings go through dateutil, and each distinct string is parsed
+# once. The babel pattern and locale of every (format, locale) pair are
+# compiled on first use and reused. format_shows labels a whole list of shows
+# at once, formatting each distinct start time a single time. babel and
+# dateutil are imported on the first call, not when the app starts.
+# ----------------------------------------------------------------------------#
+from datetime import date, datetime, time
+from functools import lru_cache
+
+# named formats of the filter, other names are babel's standard formats
+FORMATS = {
+    "full": "EEEE MMMM, d, y 'at' h:mma",
+    "medium": "EE MM, dd, y h:mma",
+}
+STANDARD_FORMATS = ("short", "long")
+
+
+@lru_cache(maxsize=4096)
+def _parse(value):
+    import dateutil.parser
+
+    return dateutil.parser.parse(value)
+
+
+@lru_cache(maxsize=None)
+def _pattern(format, locale):
+    """``(compiled pattern, Locale)`` of ``format`` in ``locale``."""
+    import babel.dates
+    from babel import Locale
+
+    return babel.dates.parse_pattern(FORMATS.get(format, format)), Locale.parse(locale)
+
+
+def to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    return _parse(value)
+
+
+def format_datetime(value, format="medium", locale="en"):
+    value = to_datetime(value)
+    if format in STANDARD_FORMATS:
+        import babel.dates
+
+        return babel.dates.format_datetime(value, format, locale=locale)
+    pattern, locale = _pattern(format, locale)
+    return pattern.apply(value, locale)
+
+
+def format_all(values, format="medium", locale="en"):
+    """``values`` formatted, each distinct value formatted once."""
+    formatted = {}
+    labels = []
+    for value in values:
+        label = formatted.get(value)
+        if label is None:
+            label = formatted[value] = format_datetime(value, format, locale)
+        labels.append(label)
+    return labels
+
+
+def format_shows(shows, format="full", key="start_time", locale="en"):
+    """Set ``show[key + "_label"]`` of every show dict to its formatted time."""
+    labels = format_all((show[key] for show in shows), format, locale)
+    for show, label in zip(shows, labels):
+        show[key + "_label"] = label
+    return shows
@@ -0,0 +1,169 @@
+# ----------------------------------------------------------------------------#
+# Engine options and connection pool monitoring.
+#
+# ``engine_options`` turns the DB_* settings of config.py into
+# SQLALCHEMY_ENGINE_OPTIONS, and ``init_engine`` sets up each engine created
+# from them (see factory.py and asgi.py). The pool records how long requests wait for a
+# connection and how many connections are checked out; ``pool_stats`` reports
+# both (served at /db/pool).
+# ----------------------------------------------------------------------------#
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, Pool, QueuePool
+
+# asyncio driver of each backend, used by the ASGI app
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.waits += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def checked_out(self):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def checked_in(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def as_dict(self):
+        return {
+            "checkouts": self.checkouts,
+            "in_use": self.in_use,
+            "max_in_use": self.max_in_use,
+            "avg_wait_ms": self.total_wait / self.waits * 1000 if self.waits else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+stats = PoolStats()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool recording how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            stats.record_wait(time.perf_counter() - start)
+
+
+@event.listens_for(Pool, "checkout")
+def _checkout(dbapi_connection, connection_record, connection_proxy):
+    stats.checked_out()
+
+
+@event.listens_for(Pool, "checkin")
+def _checkin(dbapi_connection, connection_record):
+    stats.checked_in()
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the DB_* settings of ``config``."""
+    uri = config.SQLALCHEMY_DATABASE_URI
+    options = {"pool_pre_ping": config.DB_POOL_PRE_PING}
+    if uri.startswith("sqlite"):
+        return options
+
+    options.update(_pool_options(config))
+    if not config.DB_EXTERNAL_POOLER:
+        options["poolclass"] = TimedQueuePool
+
+    timeout = config.DB_STATEMENT_TIMEOUT_MS
+    # behind an external pooler the timeout is set by init_engine
+    if timeout and uri.startswith("postgres") and not config.DB_EXTERNAL_POOLER:
+        options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def init_engine(engine, config):
+    """Set up ``engine`` (or the ``sync_engine`` of an async one) for ``config``.
+
+    Startup options don't survive a transaction-pooling proxy: with
+    DB_EXTERNAL_POOLER the statement timeout of Postgres is set at the start
+    of every transaction instead. Call it once per engine.
+    """
+    timeout = config.DB_STATEMENT_TIMEOUT_MS
+    if not (timeout and config.DB_EXTERNAL_POOLER):
+        return
+    if engine.dialect.name != "postgresql":
+        return
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+
+def _pool_options(config):
+    if config.DB_EXTERNAL_POOLER:
+        # PgBouncer & co. own the pooling, keep no idle connections here
+        return {"poolclass": NullPool}
+    return {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+    }
+
+
+def async_database_uri(config):
+    """URL of the database for the asyncio drivers (see asgi.py)."""
+    if config.ASYNC_DATABASE_URI:
+        return config.ASYNC_DATABASE_URI
+    url = make_url(config.SQLALCHEMY_DATABASE_URI)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver known for {backend!r} databases")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def async_engine_options(config):
+    """``create_async_engine`` options for the same DB_* settings.
+
+    Checkout waits are not recorded for the asyncio pool. Behind an external
+    pooler the timeout is set by :func:`init_engine`, as for the sync engine.
+    """
+    options = {"pool_pre_ping": config.DB_POOL_PRE_PING}
+    if config.SQLALCHEMY_DATABASE_URI.startswith("sqlite"):
+        return options
+    options.update(_pool_options(config))
+    timeout = config.DB_STATEMENT_TIMEOUT_MS
+    if timeout and not config.DB_EXTERNAL_POOLER:
+        options["connect_args"] = {
+            "server_settings": {"statement_timeout": str(int(timeout))}
+        }
+    return options
+
+
+def pool_stats(engine):
+    data = stats.as_dict()
+    pool = engine.pool
+    data["pool"] = type(pool).__name__
+    if isinstance(pool, QueuePool):
+        data.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            idle=pool.checkedin(),
+        )
+    return data
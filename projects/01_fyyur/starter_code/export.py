@@ -0,0 +1,85 @@
+# ----------------------------------------------------------------------------#
+# Streaming CSV/NDJSON export of venues, artists and shows.
+#
+# Rows are read through a server-side cursor (``stream_results``) in chunks of
+# EXPORT_CHUNK_SIZE and serialized as they arrive, so memory use does not grow
+# with the table size. Used by the /export/<entity>.<format> endpoints and by
+# ``flask export``.
+# ----------------------------------------------------------------------------#
+import csv
+import io
+import json
+from datetime import datetime
+
+from sqlalchemy import select
+
+from models import Artist, Show, Venue, db
+
+ENTITIES = {"venues": Venue, "artists": Artist, "shows": Show}
+FORMATS = ("csv", "ndjson")
+EXPORT_CHUNK_SIZE = 1000
+
+
+class ExportError(ValueError):
+    pass
+
+
+def _parse_time(value, name):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f"{name} must be an ISO 8601 date or datetime")
+
+
+def export_statement(entity, start_from=None, start_to=None, state=None):
+    """SELECT of every column of ``entity`` in id order, with optional filters.
+
+    ``start_from``/``start_to`` bound the start time of shows (inclusive,
+    exclusive); ``state`` filters venues and artists.
+    """
+    model = ENTITIES[entity]
+    statement = select(*model.__table__.columns).order_by(model.id)
+    if model is Show:
+        if start_from:
+            statement = statement.where(
+                Show.start_time >= _parse_time(start_from, "start_from")
+            )
+        if start_to:
+            statement = statement.where(
+                Show.start_time < _parse_time(start_to, "start_to")
+            )
+    elif state:
+        statement = statement.where(model.state == state)
+    return statement
+
+
+def iter_rows(statement, chunk_size=EXPORT_CHUNK_SIZE):
+    result = db.session.execute(
+        statement.execution_options(stream_results=True, max_row_buffer=chunk_size)
+    )
+    for chunk in result.partitions(chunk_size):
+        yield result.keys(), chunk
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def generate(statement, format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the serialized export one chunk of rows at a time."""
+    header_written = False
+    for keys, chunk in iter_rows(statement, chunk_size):
+        buffer = io.StringIO()
+        if format == "csv":
+            writer = csv.writer(buffer)
+            if not header_written:
+                writer.writerow(list(keys))
+                header_written = True
+            writer.writerows([_plain(v) for v in row] for row in chunk)
+        else:
+            for row in chunk:
+                buffer.write(json.dumps(dict(zip(keys, row)), default=_plain))
+                buffer.write("\n")
+        yield buffer.getvalue()
+    if format == "csv" and not header_written:
+        yield ",".join(column.name for column in statement.selected_columns) + "\r\n"
@@ -0,0 +1,20 @@
+# ----------------------------------------------------------------------------#
+# Extension instances, bound to an app by factory.create_app.
+#
+# They are created here without an app so that the blueprints can import
+# them (``@page_cache.cached`` is applied at import time) before any app
+# exists. Flask-Migrate and Flask-DebugToolbar are not created here: they are
+# only imported when used, see commands.py and factory.py.
+# ----------------------------------------------------------------------------#
+from flask_moment import Moment
+
+from assets import Assets
+from cache import PageCache
+from profiling import QueryProfiler
+from replicas import ReplicaRouter
+
+moment = Moment()
+page_cache = PageCache()
+profiler = QueryProfiler()
+replicas = ReplicaRouter()
+static_assets = Assets()
@@ -13,6 +13,11 @@ def test():
         abort("Aborted at user request.")
 
 
+def benchmark(sizes="small medium"):
+    # times every route, results in benchmarks/results/<commit>.json
+    local("python benchmarks/route_benchmark.py --sizes {}".format(sizes))
+
+
 def commit():
     message = raw_input("Enter a git commit message: ")
     local("git add . && git commit -am '{}'".format(message))
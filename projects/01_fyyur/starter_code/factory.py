@@ -0,0 +1,90 @@
+# ----------------------------------------------------------------------------#
+# Application factory.
+#
+#     app = create_app()                 # config.py
+#     app = create_app(TestingConfig)    # any object with the same settings
+#
+# app.py builds the app of the servers and of the flask CLI with the default
+# config; tests and tools build their own. Modules that are slow to import and
+# only needed by some requests or commands (Flask-Migrate and alembic, the
+# forms, babel, dateutil, the debug toolbar) are imported on first use.
+# ----------------------------------------------------------------------------#
+import logging
+from logging import FileHandler, Formatter
+
+from flask import Flask
+from werkzeug.utils import import_string
+
+import artists
+import commands
+import config as default_config
+import dates
+import main
+import shows
+import templating
+import venues
+from api import api
+from db_pool import engine_options, init_engine
+from extensions import moment, page_cache, profiler, replicas, static_assets
+from models import db
+from pagination import cursor_url
+
+
+def create_app(config=default_config):
+    """A new app configured from ``config``, a module, class or import path."""
+    if isinstance(config, str):
+        config = import_string(config)
+    app = Flask(__name__)
+    app.config.from_object(config)
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(config)
+
+    replicas.init_app(app)  # adds its binds, before db.init_app
+    db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            init_engine(engine, config)
+    moment.init_app(app)
+    page_cache.init_app(app)
+    profiler.init_app(app)
+    templating.init_bytecode_cache(app)
+    static_assets.init_app(app)
+    if app.config.get("DEBUG_TB_ENABLED"):
+        _init_toolbar(app)
+
+    app.jinja_env.filters["datetime"] = dates.format_datetime
+    app.jinja_env.globals["cursor_url"] = cursor_url
+
+    register_blueprints(app)
+    if not app.debug:
+        _log_to_file(app)
+    return app
+
+
+def register_blueprints(app):
+    app.register_blueprint(main.blueprint)
+    app.register_blueprint(venues.blueprint)
+    app.register_blueprint(artists.blueprint)
+    app.register_blueprint(shows.blueprint)
+    app.register_blueprint(api)
+    app.register_blueprint(commands.blueprint)
+
+
+def _init_toolbar(app):
+    try:
+        from flask_debugtoolbar import DebugToolbarExtension
+    except ImportError:  # optional
+        app.logger.warning("DEBUG_TOOLBAR is set but flask-debugtoolbar is missing")
+        return
+    DebugToolbarExtension(app)
+
+
+def _log_to_file(app):
+    file_handler = FileHandler("error.log")
+    file_handler.setFormatter(
+        Formatter("%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]")
+    )
+    app.logger.setLevel(logging.INFO)
+    file_handler.setLevel(logging.INFO)
+    app.logger.addHandler(file_handler)
+    app.logger.info("errors")
@@ -97,11 +97,11 @@ class ShowForm(Form):
 
 class VenueForm(Form):
     def validate_link(form, field):
-        if not field.data.contains("facebook.com"):
+        if "facebook.com" not in (field.data or ""):
             raise ValidationError("Invalid facebook link")
 
     def validate_phone_num(form, field):
-        if not re.search(r"\d{3}[-]\d{3}[-]\d{4}$", field.data):
+        if not re.search(r"\d{3}[-]\d{3}[-]\d{4}$", field.data or ""):
             raise ValidationError("Invalid phone number")
 
     name = StringField("name", validators=[DataRequired()])
@@ -125,13 +125,13 @@ class VenueForm(Form):
 
 class ArtistForm(Form):
     def validate_link(form, field):
-        if not field.data.contains("facebook.com"):
+        if "facebook.com" not in (field.data or ""):
             raise ValidationError("Invalid facebook link")
 
     # funtion to validate phone number
 
     def validate_phone_num(form, field):
-        if not re.search(r"\d{3}[-]\d{3}[-]\d{4}$", field.data):
+        if not re.search(r"\d{3}[-]\d{3}[-]\d{4}$", field.data or ""):
             raise ValidationError("Invalid phone number")
 
     name = StringField("name", validators=[DataRequired()])
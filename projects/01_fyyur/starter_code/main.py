@@ -0,0 +1,88 @@
+# ----------------------------------------------------------------------------#
+# Home page, typeahead, exports, stats endpoints and the error pages.
+# ----------------------------------------------------------------------------#
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    current_app,
+    jsonify,
+    render_template,
+    request,
+    stream_with_context,
+)
+
+import export
+import suggest
+from db_pool import pool_stats
+from extensions import page_cache
+from models import db
+
+blueprint = Blueprint("main", __name__)
+
+EXPORT_MIMETYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+@blueprint.route("/")
+def index():
+    return render_template("pages/home.html")
+
+
+@blueprint.route("/api/search/suggest")
+def search_suggest():
+    # typeahead for the search box, served from the in-memory name index
+    results = suggest.suggest(
+        request.args.get("q", ""),
+        max_age=current_app.config["SUGGEST_INDEX_MAX_AGE"],
+    )
+    return jsonify(results=results)
+
+
+#  Export
+#  ----------------------------------------------------------------
+
+
+@blueprint.route(
+    "/export/<any(venues, artists, shows):entity>.<any(csv, ndjson):format>"
+)
+def export_entity(entity, format):
+    # streams the whole table; shows accept ?start_from=&start_to= and
+    # venues/artists ?state=
+    try:
+        statement = export.export_statement(
+            entity,
+            start_from=request.args.get("start_from"),
+            start_to=request.args.get("start_to"),
+            state=request.args.get("state"),
+        )
+    except export.ExportError as e:
+        abort(400, str(e))
+    return Response(
+        stream_with_context(export.generate(statement, format)),
+        mimetype=EXPORT_MIMETYPES[format],
+        headers={"Content-Disposition": f"attachment; filename={entity}.{format}"},
+    )
+
+
+@blueprint.route("/cache/stats")
+def cache_stats():
+    return jsonify(page_cache.stats())
+
+
+@blueprint.route("/db/pool")
+def db_pool_stats():
+    return jsonify(pool_stats(db.engine))
+
+
+#  Errors
+#  ----------------------------------------------------------------
+
+
+@blueprint.app_errorhandler(404)
+def not_found_error(error):
+    return render_template("errors/404.html"), 404
+
+
+@blueprint.app_errorhandler(500)
+def server_error(error):
+    return render_template("errors/500.html"), 500
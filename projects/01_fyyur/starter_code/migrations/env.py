@@ -1,6 +1,7 @@
 from __future__ import with_statement
 
 import logging
+import re
 from logging.config import fileConfig
 
 from flask import current_app
@@ -71,6 +72,22 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # the search columns, indexes and FTS tables are not part of the models
+    # (they are maintained by hand in 3b9c1f0a7e21), keep autogenerate off them
+    def include_object(object, name, type_, reflected, compare_to):
+        if reflected and compare_to is None and name and (
+            name == 'search_vector'
+            or name.endswith(('_search_vector', '_name_trgm'))
+            or '_fts' in name
+        ):
+            return False
+        # monthly partitions of shows and shows_archive (see partitions.py)
+        if type_ == 'table' and re.match(
+            r'shows(_archive)?_(p\d{4}_\d{2}|default)$', name
+        ):
+            return False
+        return True
+
     connectable = current_app.extensions['migrate'].db.get_engine()
 
     with connectable.connect() as connection:
@@ -78,6 +95,7 @@ def run_migrations_online():
             connection=connection,
             target_metadata=target_metadata,
             process_revision_directives=process_revision_directives,
+            include_object=include_object,
             **current_app.extensions['migrate'].configure_args
         )
 
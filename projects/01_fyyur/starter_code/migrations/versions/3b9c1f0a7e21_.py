@@ -0,0 +1,78 @@
+"""search indexes for venues and artists
+
+Revision ID: 3b9c1f0a7e21
+Revises: ce434ec58ab8
+Create Date: 2026-10-18 10:12:41.203518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9c1f0a7e21'
+down_revision = 'ce434ec58ab8'
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = ('name', 'city', 'state', 'genres')
+
+
+def search_document(table):
+    parts = " || ' ' || ".join("coalesce({}, '')".format(c) for c in SEARCH_COLUMNS)
+    return "to_tsvector('simple', {})".format(parts)
+
+
+def sqlite_fts_ddl(table):
+    fts = '{}_fts'.format(table)
+    columns = ', '.join(SEARCH_COLUMNS)
+    new_values = ', '.join('new.{}'.format(c) for c in SEARCH_COLUMNS)
+    old_values = ', '.join('old.{}'.format(c) for c in SEARCH_COLUMNS)
+    return [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, "
+        "content='{table}', content_rowid='id', tokenize='trigram')",
+        "CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN "
+        "INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new}); END",
+        "CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN "
+        "INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old}); END",
+        "CREATE TRIGGER IF NOT EXISTS {table}_fts_au "
+        "AFTER UPDATE OF {columns} ON {table} BEGIN "
+        "INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old}); "
+        "INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new}); END",
+        "INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ], dict(fts=fts, table=table, columns=columns, new=new_values, old=old_values)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table in ('venues', 'artists'):
+            op.execute(
+                'ALTER TABLE {} ADD COLUMN search_vector tsvector '
+                'GENERATED ALWAYS AS ({}) STORED'.format(table, search_document(table))
+            )
+            op.create_index('ix_{}_search_vector'.format(table), table,
+                            ['search_vector'], postgresql_using='gin')
+            op.create_index('ix_{}_name_trgm'.format(table), table, ['name'],
+                            postgresql_using='gin',
+                            postgresql_ops={'name': 'gin_trgm_ops'})
+    elif dialect == 'sqlite':
+        for table in ('venues', 'artists'):
+            statements, names = sqlite_fts_ddl(table)
+            for statement in statements:
+                op.execute(statement.format(**names))
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for table in ('venues', 'artists'):
+            op.drop_index('ix_{}_name_trgm'.format(table), table_name=table)
+            op.drop_index('ix_{}_search_vector'.format(table), table_name=table)
+            op.drop_column(table, 'search_vector')
+    elif dialect == 'sqlite':
+        for table in ('venues', 'artists'):
+            for trigger in ('ai', 'ad', 'au'):
+                op.execute('DROP TRIGGER IF EXISTS {}_fts_{}'.format(table, trigger))
+            op.execute('DROP TABLE IF EXISTS {}_fts'.format(table))
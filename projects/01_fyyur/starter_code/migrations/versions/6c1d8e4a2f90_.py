@@ -0,0 +1,106 @@
+"""genres lookup table with artist/venue association tables
+
+Revision ID: 6c1d8e4a2f90
+Revises: 3b9c1f0a7e21
+Create Date: 2026-10-18 11:02:17.448390
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c1d8e4a2f90'
+down_revision = '3b9c1f0a7e21'
+branch_labels = None
+depends_on = None
+
+# forms.genres_choices at the time of this migration
+GENRES = [
+    'Alternative', 'Blues', 'Classical', 'Country', 'Electronic', 'Folk',
+    'Funk', 'Hip-Hop', 'Heavy Metal', 'Instrumental', 'Jazz',
+    'Musical Theatre', 'Pop', 'Punk', 'R&B', 'Reggae', 'Rock n Roll', 'Soul',
+    'Other',
+]
+
+BATCH_SIZE = 1000
+
+
+def parse_genres(value):
+    if not value:
+        return []
+    names = re.split(r"""[{}\[\]"',;]+""", value)
+    return [name.strip() for name in names if name.strip()]
+
+
+def backfill(bind, genres, owner_table, link_table, owner_column):
+    """Copy the genres strings of ``owner_table`` into ``link_table``, in batches."""
+    owners = sa.table(owner_table,
+                      sa.column('id', sa.Integer), sa.column('genres', sa.String))
+    existing = bind.execute(sa.select(genres.c.id, genres.c.name))
+    genre_ids = {name.lower(): id for id, name in existing}
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(owners.c.id, owners.c.genres)
+            .where(owners.c.id > last_id)
+            .order_by(owners.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        links = []
+        for owner_id, value in rows:
+            seen = set()
+            for name in parse_genres(value):
+                if name.lower() not in genre_ids:
+                    genre_ids[name.lower()] = bind.execute(
+                        genres.insert().values(name=name).returning(genres.c.id)
+                    ).scalar()
+                genre_id = genre_ids[name.lower()]
+                if genre_id not in seen:
+                    seen.add(genre_id)
+                    links.append({owner_column: owner_id, 'genre_id': genre_id})
+        if links:
+            op.bulk_insert(link_table, links)
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    genres = op.create_table('genres',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    venue_genres = op.create_table('venue_genres',
+    sa.Column('venue_id', sa.Integer(), nullable=False),
+    sa.Column('genre_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['genre_id'], ['genres.id'], ),
+    sa.ForeignKeyConstraint(['venue_id'], ['venues.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('venue_id', 'genre_id')
+    )
+    op.create_index('ix_venue_genres_genre_id', 'venue_genres', ['genre_id', 'venue_id'], unique=False)
+    artist_genres = op.create_table('artist_genres',
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('genre_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['artist_id'], ['artists.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['genre_id'], ['genres.id'], ),
+    sa.PrimaryKeyConstraint('artist_id', 'genre_id')
+    )
+    op.create_index('ix_artist_genres_genre_id', 'artist_genres', ['genre_id', 'artist_id'], unique=False)
+
+    op.bulk_insert(genres, [{'name': name} for name in GENRES])
+    bind = op.get_bind()
+    backfill(bind, genres, 'venues', venue_genres, 'venue_id')
+    backfill(bind, genres, 'artists', artist_genres, 'artist_id')
+
+
+def downgrade():
+    op.drop_index('ix_artist_genres_genre_id', table_name='artist_genres')
+    op.drop_table('artist_genres')
+    op.drop_index('ix_venue_genres_genre_id', table_name='venue_genres')
+    op.drop_table('venue_genres')
+    op.drop_table('genres')
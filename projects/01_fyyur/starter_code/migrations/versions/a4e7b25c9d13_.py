@@ -0,0 +1,49 @@
+"""indexes for the show, venue and artist access paths
+
+Revision ID: a4e7b25c9d13
+Revises: 6c1d8e4a2f90
+Create Date: 2026-10-18 11:47:05.918224
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4e7b25c9d13'
+down_revision = '6c1d8e4a2f90'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_shows_venue_id_start_time', 'shows', ['venue_id', 'start_time']),
+    ('ix_shows_artist_id_start_time', 'shows', ['artist_id', 'start_time']),
+    ('ix_shows_start_time_id', 'shows', ['start_time', 'id']),
+    # the /venues keyset order (queries.venue_listing)
+    ('ix_venues_state_city', 'venues', ['state', sa.text("coalesce(city, '')"), 'id']),
+    ('ix_venues_lower_name', 'venues', [sa.text('lower(name)')]),
+    ('ix_artists_lower_name', 'artists', [sa.text('lower(name)'), 'id']),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, if_not_exists=True,
+                                postgresql_concurrently=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, columns in reversed(INDEXES):
+                op.drop_index(name, table_name=table, if_exists=True,
+                              postgresql_concurrently=True)
+    else:
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)
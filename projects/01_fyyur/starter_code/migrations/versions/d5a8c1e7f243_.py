@@ -0,0 +1,143 @@
+"""monthly partitions of the shows, shows_archive table
+
+Revision ID: d5a8c1e7f243
+Revises: c37d9e0b4f18
+Create Date: 2026-10-18 21:02:44.510392
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a8c1e7f243'
+down_revision = 'c37d9e0b4f18'
+branch_labels = None
+depends_on = None
+
+# partitions created ahead of the current month (see partitions.py, which
+# keeps creating them afterwards)
+MONTHS_AHEAD = 12
+
+INDEXES = {
+    'shows': [
+        ('ix_shows_venue_id_start_time', ['venue_id', 'start_time']),
+        ('ix_shows_artist_id_start_time', ['artist_id', 'start_time']),
+        ('ix_shows_start_time_id', ['start_time', 'id']),
+    ],
+    'shows_archive': [
+        ('ix_shows_archive_venue_id_start_time', ['venue_id', 'start_time']),
+        ('ix_shows_archive_artist_id_start_time', ['artist_id', 'start_time']),
+    ],
+}
+COLUMNS = 'id, artist_id, venue_id, start_time, version'
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month):
+    return "'{:%Y-%m-%d} 00:00:00+00'".format(month)
+
+
+def _create_partitioned(table, id_default, on_delete):
+    # the partition key has to be part of the primary key
+    op.execute(
+        'CREATE TABLE {table} ('
+        'id integer NOT NULL{id_default}, '
+        'artist_id integer NOT NULL REFERENCES artists (id){on_delete}, '
+        'venue_id integer NOT NULL REFERENCES venues (id){on_delete}, '
+        'start_time timestamp with time zone NOT NULL, '
+        'version integer NOT NULL DEFAULT 1, '
+        'PRIMARY KEY (id, start_time)'
+        ') PARTITION BY RANGE (start_time)'.format(
+            table=table, id_default=id_default, on_delete=on_delete)
+    )
+    op.execute('CREATE TABLE {0}_default PARTITION OF {0} DEFAULT'.format(table))
+    for name, columns in INDEXES[table]:
+        op.create_index(name, table, columns)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        # SQLite: the archive is a plain table next to shows
+        op.create_table('shows_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('start_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('artist_id', sa.Integer(), nullable=False),
+        sa.Column('venue_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+        sa.ForeignKeyConstraint(['artist_id'], ['artists.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['venue_id'], ['venues.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        for name, columns in INDEXES['shows_archive']:
+            op.create_index(name, 'shows_archive', columns)
+        return
+
+    connection = op.get_bind()
+    # keep the id sequence when the old table is dropped
+    op.execute('ALTER SEQUENCE shows_id_seq OWNED BY NONE')
+    op.execute('ALTER TABLE shows RENAME TO shows_unpartitioned')
+    op.execute('ALTER INDEX shows_pkey RENAME TO shows_unpartitioned_pkey')
+    for name, columns in INDEXES['shows']:
+        op.execute('ALTER INDEX IF EXISTS {0} RENAME TO {0}_unpartitioned'.format(name))
+    # NULL cannot be part of the primary key; the model always sets a time
+    op.execute('UPDATE shows_unpartitioned SET start_time = CURRENT_TIMESTAMP '
+               'WHERE start_time IS NULL')
+
+    _create_partitioned('shows', " DEFAULT nextval('shows_id_seq')", '')
+    _create_partitioned('shows_archive', '', ' ON DELETE CASCADE')
+
+    now = datetime.now()
+    first = connection.execute(
+        sa.text('SELECT min(start_time) FROM shows_unpartitioned')).scalar()
+    first = min(first.replace(tzinfo=None), now) if first else now
+    month = datetime(first.year, first.month, 1)
+    last = _add_months(datetime(now.year, now.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        following = _add_months(month, 1)
+        op.execute(
+            'CREATE TABLE shows_p{:%Y_%m} PARTITION OF shows '
+            'FOR VALUES FROM ({}) TO ({})'.format(
+                month, _bound(month), _bound(following))
+        )
+        month = following
+
+    op.execute('INSERT INTO shows ({0}) SELECT {0} FROM shows_unpartitioned'.format(COLUMNS))
+    op.execute('ALTER SEQUENCE shows_id_seq OWNED BY shows.id')
+    op.execute('DROP TABLE shows_unpartitioned')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        op.execute('INSERT INTO shows ({0}) SELECT {0} FROM shows_archive'.format(COLUMNS))
+        for name, columns in reversed(INDEXES['shows_archive']):
+            op.drop_index(name, table_name='shows_archive')
+        op.drop_table('shows_archive')
+        return
+
+    op.execute('ALTER SEQUENCE shows_id_seq OWNED BY NONE')
+    op.execute(
+        'CREATE TABLE shows_unpartitioned ('
+        "id integer NOT NULL DEFAULT nextval('shows_id_seq') PRIMARY KEY, "
+        'artist_id integer NOT NULL REFERENCES artists (id), '
+        'venue_id integer NOT NULL REFERENCES venues (id), '
+        'start_time timestamp with time zone, '
+        'version integer NOT NULL DEFAULT 1)'
+    )
+    op.execute('INSERT INTO shows_unpartitioned ({0}) SELECT {0} FROM shows '
+               'UNION ALL SELECT {0} FROM shows_archive'.format(COLUMNS))
+    # dropping the partitioned tables drops their partitions, detached
+    # partitions are left alone
+    op.execute('DROP TABLE shows_archive')
+    op.execute('DROP TABLE shows')
+    op.execute('ALTER TABLE shows_unpartitioned RENAME TO shows')
+    op.execute('ALTER INDEX shows_unpartitioned_pkey RENAME TO shows_pkey')
+    op.execute('ALTER SEQUENCE shows_id_seq OWNED BY shows.id')
+    for name, columns in INDEXES['shows']:
+        op.create_index(name, 'shows', columns)
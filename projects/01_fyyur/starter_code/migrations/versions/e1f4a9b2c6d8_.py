@@ -0,0 +1,41 @@
+"""never reuse show ids on SQLite
+
+Revision ID: e1f4a9b2c6d8
+Revises: d5a8c1e7f243
+Create Date: 2026-10-18 22:14:08.731250
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f4a9b2c6d8'
+down_revision = 'd5a8c1e7f243'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Postgres takes the ids from a sequence, which never goes back. SQLite
+    # reuses the highest id once its show is moved to shows_archive, unless
+    # the table is AUTOINCREMENT.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('shows', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}):
+        pass
+    # ids already archived must not be handed out again either
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'shows'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'shows', coalesce(max(id), 0) "
+        'FROM (SELECT id FROM shows UNION ALL SELECT id FROM shows_archive)'
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('shows', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}):
+        pass
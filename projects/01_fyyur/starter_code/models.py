@@ -2,25 +2,74 @@
 # imports
 # ----------------------------------------------------------------
 from datetime import datetime
+import re
 from email.policy import default
 from time import timezone
-from flask import Flask
-from flask_migrate import Migrate
-from flask_moment import Moment
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.sql import func
-import config
+from sqlalchemy.sql import func, literal_column
 
-app = Flask(__name__)
+from replicas import RoutingSession
 
-app.config["SQLALCHEMY_DATABASE_URI"] = config.SQLALCHEMY_DATABASE_URI
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-db = SQLAlchemy(app)
+# bound to the app by factory.create_app; the reads of GET requests go to a
+# replica when there are some (see replicas.py)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+class Genre(db.Model):
+    __tablename__ = "genres"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False, unique=True)
+
+
+venue_genres = db.Table(
+    "venue_genres",
+    db.Column(
+        "venue_id",
+        db.Integer,
+        db.ForeignKey("venues.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    db.Column("genre_id", db.Integer, db.ForeignKey("genres.id"), primary_key=True),
+    db.Index("ix_venue_genres_genre_id", "genre_id", "venue_id"),
+)
+
+artist_genres = db.Table(
+    "artist_genres",
+    db.Column(
+        "artist_id",
+        db.Integer,
+        db.ForeignKey("artists.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    db.Column("genre_id", db.Integer, db.ForeignKey("genres.id"), primary_key=True),
+    db.Index("ix_artist_genres_genre_id", "genre_id", "artist_id"),
+)
+
+
+def parse_genres(value):
+    """Split a stored genres string ("Jazz", "{Jazz,Rock n Roll}", ...) into names."""
+    if not value:
+        return []
+    names = re.split(r"""[{}\[\]"',;]+""", value)
+    return [name.strip() for name in names if name.strip()]
+
+
+def genres_by_name(names):
+    """Return the Genre rows for ``names``, creating the missing ones."""
+    names = list(dict.fromkeys(name for name in names if name))
+    if not names:
+        return []
+    genres = {g.name: g for g in Genre.query.filter(Genre.name.in_(names)).all()}
+    for name in names:
+        if name not in genres:
+            genres[name] = Genre(name=name)
+            db.session.add(genres[name])
+    return [genres[name] for name in names]
 
 
 class Venue(db.Model):
     __tablename__ = "venues"
-
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String, nullable=False)
     city = db.Column(db.String(120), nullable=True)
@@ -33,9 +82,23 @@ class Venue(db.Model):
     website_link = db.Column(db.String(120))
     seeking_talent = db.Column(db.Boolean, nullable=False, default=False)
     seeking_description = db.Column(db.String(150))
+    # maintained by counters.py
+    upcoming_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    past_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    # bumped by every ORM update, used for the API ETags
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
     shows = db.relationship(
-        "Show", backref="venues", lazy=True, cascade="all, delete-orphan"
+        "Show", backref="venue", lazy=True, cascade="all, delete-orphan"
     )
+    genre_tags = db.relationship(
+        "Genre", secondary=venue_genres, lazy=True, backref="venues"
+    )
+
+    __mapper_args__ = {"version_id_col": version}
 
     def venue_details(self):
         return {
@@ -49,7 +112,7 @@ class Venue(db.Model):
             "image_link": self.image_link,
             "facebook_link": self.facebook_link,
             "website_link": self.website_link,
-            "seeking_artist": self.seeking_artist,
+            "seeking_talent": self.seeking_talent,
             "seeking_description": self.seeking_description,
         }
 
@@ -70,9 +133,23 @@ class Artist(db.Model):
     website_link = db.Column(db.String(150))
     seeking_venue = db.Column(db.Boolean, nullable=False, default=False)
     seeking_description = db.Column(db.String(200), nullable=False)
+    # maintained by counters.py
+    upcoming_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    past_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    # bumped by every ORM update, used for the API ETags
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
     shows = db.relationship(
-        "Show", backref="artists", lazy=True, cascade="all, delete-orphan"
+        "Show", backref="artist", lazy=True, cascade="all, delete-orphan"
     )
+    genre_tags = db.relationship(
+        "Genre", secondary=artist_genres, lazy=True, backref="artists"
+    )
+
+    __mapper_args__ = {"version_id_col": version}
 
     def artist_info(self):
         return {
@@ -94,10 +171,25 @@ class Artist(db.Model):
 
 class Show(db.Model):
     __tablename__ = "shows"
+    # partitioned by month on Postgres (see partitions.py), where the primary
+    # key of the table is (id, start_time). The partitioning is left to
+    # migration d5a8c1e7f243: the ORM keeps identifying a show by its id, and
+    # a table made by create_all() is simply not partitioned.
+    __table_args__ = (
+        db.Index("ix_shows_venue_id_start_time", "venue_id", "start_time"),
+        db.Index("ix_shows_artist_id_start_time", "artist_id", "start_time"),
+        db.Index("ix_shows_start_time_id", "start_time", "id"),
+        # on SQLite the ids of archived shows must not be handed out again
+        {"sqlite_autoincrement": True},
+    )
     id = db.Column(db.Integer, primary_key=True)
     start_time = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
     artist_id = db.Column(db.Integer, db.ForeignKey(Artist.id), nullable=False)
     venue_id = db.Column(db.Integer, db.ForeignKey(Venue.id), nullable=False)
+    # bumped by every ORM update, used for the API ETags
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
 
     def show_details(self):
         return {
@@ -109,29 +201,60 @@ class Show(db.Model):
 
     def artist_info(self):
         return {
-            "artist_id": self.venue_id,
-            "artist_name": self.Artist.name,
-            "artist_image_link": self.Artist.image_link,
+            "artist_id": self.artist_id,
+            "artist_name": self.artist.name,
+            "artist_image_link": self.artist.image_link,
             "start_time": self.start_time,
         }
 
     def show_info(self):
         return {
             "venue_id": self.venue_id,
-            "venue_name": self.Venue.name,
+            "venue_name": self.venue.name,
             "artist_id": self.artist_id,
-            "artist_name": self.Artist.name,
-            "artist_image_link": self.Artist.image_link,
+            "artist_name": self.artist.name,
+            "artist_image_link": self.artist.image_link,
             "start_time": self.start_time,
         }
 
     def venue_info(self):
         return {
             "venue_id": self.venue_id,
-            #'venue_name' :self.Venue.name,
-            #'venue_image_link' :self.Venue.image_link,
+            "venue_name": self.venue.name,
+            "venue_image_link": self.venue.image_link,
             "start_time": self.start_time,
         }
 
 
+class ArchivedShow(db.Model):
+    """A show moved out of ``shows`` with the months it was in, see partitions.py."""
+
+    __tablename__ = "shows_archive"
+    __table_args__ = (
+        db.Index("ix_shows_archive_venue_id_start_time", "venue_id", "start_time"),
+        db.Index("ix_shows_archive_artist_id_start_time", "artist_id", "start_time"),
+    )
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    start_time = db.Column(db.DateTime(timezone=True))
+    artist_id = db.Column(
+        db.Integer, db.ForeignKey(Artist.id, ondelete="CASCADE"), nullable=False
+    )
+    venue_id = db.Column(
+        db.Integer, db.ForeignKey(Venue.id, ondelete="CASCADE"), nullable=False
+    )
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+
+
+# the /venues listing order, see queries.venue_listing
+db.Index(
+    "ix_venues_state_city",
+    Venue.state,
+    func.coalesce(Venue.city, literal_column("''")),
+    Venue.id,
+)
+# case-insensitive name lookups and the alphabetical artist listing
+db.Index("ix_venues_lower_name", func.lower(Venue.name))
+db.Index("ix_artists_lower_name", func.lower(Artist.name), Artist.id)
+
+
 # TODO Implement Show and Artist models, and complete all model relationships and properties, as a database migration.
@@ -0,0 +1,145 @@
+# ----------------------------------------------------------------------------#
+# Keyset (cursor) pagination for the listing pages.
+# ----------------------------------------------------------------------------#
+import base64
+import json
+from datetime import datetime
+
+from flask import abort, current_app, request, url_for
+from sqlalchemy import tuple_
+
+
+class Page:
+    """One page of a listing plus the cursors of its neighbours."""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None, limit=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.limit = limit
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def encode_cursor(values):
+    # datetimes are the only non-JSON values used as sort keys
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort_columns):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        abort(400)
+    if not isinstance(values, list) or len(values) != len(sort_columns):
+        abort(400)
+    decoded = []
+    for value, column in zip(values, sort_columns):
+        if value is not None:
+            value = _decode_value(value, column.type.python_type)
+        decoded.append(value)
+    return tuple(decoded)
+
+
+def _decode_value(value, python_type):
+    """``value`` as the ``python_type`` of its column, 400 when it isn't one."""
+    if python_type is datetime:
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            abort(400)
+    # JSON has no separate integers and booleans: true is not an id
+    if isinstance(value, bool) and python_type is not bool:
+        abort(400)
+    if python_type is float and isinstance(value, int):
+        return float(value)
+    # object: an untyped expression, nothing to check
+    if not isinstance(value, python_type):
+        abort(400)
+    return value
+
+
+def page_args():
+    """Read ``after``/``before``/``limit`` from the query string."""
+    default_limit = current_app.config.get("DEFAULT_PAGE_SIZE", 50)
+    max_limit = current_app.config.get("MAX_PAGE_SIZE", 200)
+    limit = request.args.get("limit", default_limit, type=int)
+    limit = max(1, min(limit, max_limit))
+    return request.args.get("after"), request.args.get("before"), limit
+
+
+def keyset_paginate(query, sort_columns, row_key, after=None, before=None, limit=50):
+    """Return a :class:`Page` of ``query`` seeking on ``sort_columns``.
+
+    ``sort_columns`` must end with a unique column (the primary key) so that
+    the ordering is total, and ``row_key`` maps a result row to the values of
+    those columns. The page is located with a ``(keys) > (cursor)`` predicate
+    instead of OFFSET, so every page costs the same as the first one.
+    """
+    query = keyset_statement(query, sort_columns, after, before, limit)
+    return page_from_rows(query.all(), row_key, after, before, limit)
+
+
+def keyset_statement(statement, sort_columns, after=None, before=None, limit=50):
+    """Add the seek predicate, ordering and limit of a page to ``statement``.
+
+    Works on ``Query`` objects and ``select()`` statements alike; the rows it
+    returns are turned into a page by :func:`page_from_rows`.
+    """
+    key = tuple_(*sort_columns)
+    backwards = before is not None and after is None
+    # the redundant bound on the leading column is what SQLite seeks the index
+    # with; it does not for a row value starting with an expression
+    # (lower(name), coalesce(city, '')...)
+    if after is not None:
+        cursor = decode_cursor(after, sort_columns)
+        statement = statement.filter(sort_columns[0] >= cursor[0], key > cursor)
+    elif backwards:
+        cursor = decode_cursor(before, sort_columns)
+        statement = statement.filter(sort_columns[0] <= cursor[0], key < cursor)
+
+    if backwards:
+        statement = statement.order_by(*[column.desc() for column in sort_columns])
+    else:
+        statement = statement.order_by(*sort_columns)
+    # one extra row tells whether there is a following page
+    return statement.limit(limit + 1)
+
+
+def page_from_rows(rows, row_key, after=None, before=None, limit=50):
+    backwards = before is not None and after is None
+    has_more = len(rows) > limit
+    rows = list(rows[:limit])
+    if backwards:
+        rows.reverse()
+
+    # walking backwards we came from the following page, so it always exists
+    if backwards:
+        more_after, more_before = True, has_more
+    else:
+        more_after, more_before = has_more, after is not None
+
+    next_cursor = prev_cursor = None
+    if rows and more_after:
+        next_cursor = encode_cursor(row_key(rows[-1]))
+    if rows and more_before:
+        prev_cursor = encode_cursor(row_key(rows[0]))
+    return Page(rows, next_cursor=next_cursor, prev_cursor=prev_cursor, limit=limit)
+
+
+def cursor_url(**cursor):
+    """URL of the current listing with ``after``/``before`` replaced."""
+    args = request.args.to_dict()
+    args.pop("after", None)
+    args.pop("before", None)
+    args.update(cursor)
+    return url_for(request.endpoint, **request.view_args, **args)
@@ -0,0 +1,191 @@
+# ----------------------------------------------------------------------------#
+# Monthly partitions of the shows table.
+#
+# On Postgres ``shows`` and ``shows_archive`` are range partitioned on
+# start_time (migration d5a8c1e7f243): one ``<table>_pYYYY_MM`` partition per
+# month, plus ``<table>_default`` for the start times no partition covers.
+# The venue and artist pages select their upcoming shows with
+# ``start_time > now`` (see queries.detail_statement), so the planner only
+# reads the partitions of the current and future months for them.
+#
+# `flask partitions maintain`, to be run daily, creates the partitions of the
+# next SHOWS_PARTITION_MONTHS_AHEAD months and, when SHOWS_RETAIN_MONTHS is
+# set, retires the months older than that: their partitions are detached
+# from ``shows`` and attached to ``shows_archive``, without copying a row.
+#
+# SQLite has no partitioning; there ``shows`` and ``shows_archive`` are plain
+# tables, the hot and the archive side of the same split, and retiring a
+# month moves its rows from one to the other in a single transaction.
+# ----------------------------------------------------------------------------#
+import re
+from datetime import datetime
+
+from sqlalchemy import delete, insert, select, text
+
+from models import ArchivedShow, Show
+
+TABLES = ("shows", "shows_archive")
+
+_PARTITION = re.compile(r"^(shows|shows_archive)_p(\d{4})_(\d{2})$")
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y_%m}"
+
+
+def _bound(month):
+    # partition bounds are UTC midnights, literal since DDL takes no parameters
+    return f"'{month:%Y-%m-%d} 00:00:00+00'"
+
+
+def is_partitioned(connection, table="shows"):
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(
+        connection.scalar(
+            text(
+                "SELECT count(*) FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :table"
+            ),
+            {"table": table},
+        )
+    )
+
+
+def partition_months(connection, table="shows"):
+    """``{month: partition name}`` of the monthly partitions of ``table``."""
+    names = connection.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :table"
+        ),
+        {"table": table},
+    )
+    months = {}
+    for name in names:
+        match = _PARTITION.match(name)
+        if match:
+            months[datetime(int(match[2]), int(match[3]), 1)] = name
+    return months
+
+
+def create_partition(connection, table, month):
+    """Add the partition of ``month`` to ``table``.
+
+    Rows of that month already in the default partition are moved into the
+    new partition before it is attached, which Postgres requires.
+    """
+    name = partition_name(table, month)
+    lower, upper = _bound(month), _bound(add_months(month, 1))
+    connection.exec_driver_sql(
+        f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    connection.exec_driver_sql(
+        f"WITH moved AS (DELETE FROM {table}_default "
+        f"WHERE start_time >= {lower} AND start_time < {upper} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    )
+    connection.exec_driver_sql(
+        f"ALTER TABLE {table} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ({lower}) TO ({upper})"
+    )
+    return name
+
+
+def ensure_partitions(connection, ahead=12, now=None):
+    """Create the missing ``shows`` partitions, this month to ``ahead`` months on."""
+    current = month_start(now or datetime.now())
+    existing = partition_months(connection)
+    return [
+        create_partition(connection, "shows", month)
+        for month in (add_months(current, n) for n in range(ahead + 1))
+        if month not in existing
+    ]
+
+
+def retire(connection, before):
+    """Move the shows of the months before ``before`` to ``shows_archive``.
+
+    Returns the retired months. ``before`` is rounded down to its month.
+    """
+    before = month_start(before)
+    if is_partitioned(connection):
+        return _retire_partitions(connection, before)
+
+    months = {
+        month_start(start_time)
+        for start_time in connection.scalars(
+            select(Show.start_time).where(Show.start_time < before).distinct()
+        )
+    }
+    columns = [column.name for column in Show.__table__.columns]
+    old = Show.start_time < before
+    connection.execute(
+        insert(ArchivedShow).from_select(
+            columns, select(*(Show.__table__.c[name] for name in columns)).where(old)
+        )
+    )
+    connection.execute(delete(Show).where(old))
+    return sorted(months)
+
+
+def _retire_partitions(connection, before):
+    archived = partition_months(connection, "shows_archive")
+    retired = []
+    for month, name in sorted(partition_months(connection).items()):
+        if month >= before:
+            break
+        lower, upper = _bound(month), _bound(add_months(month, 1))
+        connection.exec_driver_sql(f"ALTER TABLE shows DETACH PARTITION {name}")
+        if month in archived:
+            # the archive has that month already, add the rows to it
+            connection.exec_driver_sql(
+                f"INSERT INTO {archived[month]} SELECT * FROM {name}"
+            )
+            connection.exec_driver_sql(f"DROP TABLE {name}")
+        else:
+            target = partition_name("shows_archive", month)
+            connection.exec_driver_sql(f"ALTER TABLE {name} RENAME TO {target}")
+            connection.exec_driver_sql(
+                f"ALTER TABLE shows_archive ATTACH PARTITION {target} "
+                f"FOR VALUES FROM ({lower}) TO ({upper})"
+            )
+        retired.append(month)
+    return retired
+
+
+def maintain(connection, ahead=12, retain_months=None, now=None):
+    """``(created partitions, retired months)`` of the daily maintenance."""
+    current = month_start(now or datetime.now())
+    created = []
+    if is_partitioned(connection):
+        created = ensure_partitions(connection, ahead, current)
+    retired = []
+    if retain_months:
+        retired = retire(connection, add_months(current, -retain_months))
+    return created, retired
+
+
+def table_sizes(connection):
+    """``[(table, rows)]`` of the shows tables and of their partitions."""
+    sizes = []
+    for table in TABLES:
+        names = [table]
+        if is_partitioned(connection, table):
+            months = partition_months(connection, table)
+            names += [months[month] for month in sorted(months)]
+            names.append(f"{table}_default")
+        for name in names:
+            count = connection.exec_driver_sql(f"SELECT count(*) FROM {name}")
+            sizes.append((name, count.scalar()))
+    return sizes
@@ -0,0 +1,137 @@
+# ----------------------------------------------------------------------------#
+# Per-request SQL profiling.
+#
+# Engine events count the statements run by each request and the time spent
+# executing them. The totals are sent in a Server-Timing header
+# (``db;dur=3.21;desc="7 queries"``) and listed by the Flask-DebugToolbar
+# panel ``profiling_panel.SQLProfilePanel`` when the toolbar is installed.
+#
+# Statements are grouped by shape: the SQL with its literals and IN lists
+# collapsed. A shape run more than SQL_REPEAT_THRESHOLD times in one request
+# is what an N+1 loop looks like; it is logged as a warning, or raised as
+# RepeatedQueryError when SQL_REPEAT_RAISE is set (the default when testing).
+# ----------------------------------------------------------------------------#
+import re
+import time
+from collections import Counter, defaultdict
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|\$\d+|(?<![:\w]):\w+|\?")
+_LIST = re.compile(r"\(\?(?:\s*,\s*\?)+\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+class RepeatedQueryError(AssertionError):
+    pass
+
+
+def statement_shape(statement):
+    """``statement`` with placeholders, literals and IN lists normalized."""
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _LITERAL.sub("?", shape)
+    shape = _LIST.sub("(?)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.shape_durations = defaultdict(float)
+
+    def record(self, statement, seconds):
+        shape = statement_shape(statement)
+        self.count += 1
+        self.duration += seconds
+        self.shapes[shape] += 1
+        self.shape_durations[shape] += seconds
+
+    def repeated(self, threshold):
+        """``(shape, count)`` of the shapes run more than ``threshold`` times."""
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count > threshold
+        ]
+
+    @property
+    def queries(self):
+        return "1 query" if self.count == 1 else f"{self.count} queries"
+
+    def server_timing(self):
+        elapsed = time.perf_counter() - self.started
+        return (
+            f'db;dur={self.duration * 1000:.2f};desc="{self.queries}", '
+            f"app;dur={elapsed * 1000:.2f}"
+        )
+
+
+def current_profile():
+    """The profile of the current request, None outside of requests."""
+    if not has_request_context():
+        return None
+    return g.get("_sql_profile")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current_profile() is not None:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_profile_started", None)
+    profile = current_profile()
+    if started is not None and profile is not None:
+        profile.record(statement, time.perf_counter() - started)
+
+
+class QueryProfiler:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("SQL_PROFILING", True)
+        app.config.setdefault("SQL_REPEAT_THRESHOLD", 10)
+        app.config.setdefault("SQL_REPEAT_RAISE", None)
+        if not app.config["SQL_PROFILING"]:
+            return
+        # every engine, including the sync side of the ASGI app's engine
+        if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.extensions["query_profiler"] = self
+
+    def _start(self):
+        g._sql_profile = RequestProfile()
+
+    def _finish(self, response):
+        profile = current_profile()
+        if profile is None:
+            return response
+        response.headers.add("Server-Timing", profile.server_timing())
+
+        threshold = current_app.config["SQL_REPEAT_THRESHOLD"]
+        repeated = profile.repeated(threshold)
+        if repeated:
+            message = "; ".join(f"{count} x {shape[:200]}" for shape, count in repeated)
+            raise_ = current_app.config["SQL_REPEAT_RAISE"]
+            if raise_ is None:
+                raise_ = current_app.testing
+            if raise_:
+                raise RepeatedQueryError(
+                    f"{request.method} {request.path} repeated a statement "
+                    f"more than {threshold} times: {message}"
+                )
+            current_app.logger.warning(
+                "Possible N+1 on %s %s: %s", request.method, request.path, message
+            )
+        return response
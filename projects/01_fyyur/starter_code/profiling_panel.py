@@ -0,0 +1,50 @@
+# ----------------------------------------------------------------------------#
+# Flask-DebugToolbar panel of the per-request SQL profile (see profiling.py).
+#
+# Kept out of profiling.py so that the toolbar is only imported when it is
+# enabled: the toolbar loads this module from DEBUG_TB_PANELS.
+# ----------------------------------------------------------------------------#
+from flask_debugtoolbar.panels import DebugPanel
+from markupsafe import escape
+
+from profiling import current_profile
+
+
+class SQLProfilePanel(DebugPanel):
+    """Flask-DebugToolbar panel listing the statement shapes of the request.
+
+    Enabled by adding ``"profiling_panel.SQLProfilePanel"`` to DEBUG_TB_PANELS.
+    """
+
+    name = "SQLProfile"
+    has_content = True
+
+    def nav_title(self):
+        return "SQL profile"
+
+    def nav_subtitle(self):
+        profile = current_profile()
+        if profile is None:
+            return ""
+        return f"{profile.queries} in {profile.duration * 1000:.2f}ms"
+
+    def title(self):
+        return "Statements by shape"
+
+    def url(self):
+        return ""
+
+    def content(self):
+        profile = current_profile()
+        if profile is None:
+            return "SQL profiling is disabled."
+        rows = "".join(
+            f"<tr><td>{count}</td>"
+            f"<td>{profile.shape_durations[shape] * 1000:.2f}</td>"
+            f"<td><code>{escape(shape)}</code></td></tr>"
+            for shape, count in profile.shapes.most_common()
+        )
+        return (
+            "<table><thead><tr><th>Count</th><th>Total ms</th><th>Statement</th>"
+            f"</tr></thead><tbody>{rows}</tbody></table>"
+        )
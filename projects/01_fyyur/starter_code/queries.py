@@ -0,0 +1,335 @@
+# ----------------------------------------------------------------------------#
+# Statements of the read views.
+#
+# The listing and detail queries are built as ``select()`` statements so that
+# the WSGI views (venues.py, artists.py, shows.py) and the ASGI read app of
+# asgi.py run the same SQL, one through ``db.session`` and the other through
+# an AsyncSession. The helpers below turn the result rows into what the
+# templates expect; paginate and detail_with_shows run them for the WSGI views.
+# ----------------------------------------------------------------------------#
+from datetime import datetime
+
+from flask import abort, current_app, request
+from sqlalchemy import (
+    and_,
+    func,
+    literal,
+    literal_column,
+    select,
+    true,
+    tuple_,
+    union_all,
+)
+
+import dates
+from models import (
+    ArchivedShow,
+    Artist,
+    Genre,
+    Show,
+    Venue,
+    artist_genres,
+    db,
+    venue_genres,
+)
+from pagination import (
+    decode_cursor,
+    encode_cursor,
+    keyset_statement,
+    page_args,
+    page_from_rows,
+)
+
+
+def venue_listing(genre=None):
+    """``(statement, sort_columns, row_key)`` of the /venues listing.
+
+    Every venue with its maintained upcoming shows counter (see counters.py),
+    sorted so that venues of the same area are adjacent.
+    """
+    statement = select(
+        Venue.id,
+        Venue.name,
+        Venue.city,
+        Venue.state,
+        Venue.upcoming_shows_count.label("num_upcoming_shows"),
+    )
+    if genre:
+        statement = (
+            statement.join(venue_genres, venue_genres.c.venue_id == Venue.id)
+            .join(Genre, Genre.id == venue_genres.c.genre_id)
+            .where(Genre.name == genre)
+        )
+    # the order of ix_venues_state_city; '' is inlined, an expression index
+    # does not match a bound parameter
+    return (
+        statement,
+        (Venue.state, func.coalesce(Venue.city, literal_column("''")), Venue.id),
+        lambda venue: (venue.state, venue.city or "", venue.id),
+    )
+
+
+def group_areas(venues):
+    """Group listed venues by (city, state) in a single pass over the rows."""
+    areas = []
+    for venue in venues:
+        if not areas or (areas[-1]["city"], areas[-1]["state"]) != (
+            venue.city,
+            venue.state,
+        ):
+            areas.append({"city": venue.city, "state": venue.state, "venues": []})
+        areas[-1]["venues"].append(
+            {
+                "id": venue.id,
+                "name": venue.name,
+                "num_upcoming_shows": venue.num_upcoming_shows,
+            }
+        )
+    return areas
+
+
+def artist_listing(genre=None):
+    """``(statement, sort_columns, row_key)`` of the /artists listing."""
+    sort_name = func.lower(Artist.name, type_=Artist.name.type).label("sort_name")
+    statement = select(Artist.id, Artist.name, sort_name)
+    if genre:
+        statement = (
+            statement.join(artist_genres, artist_genres.c.artist_id == Artist.id)
+            .join(Genre, Genre.id == artist_genres.c.genre_id)
+            .where(Genre.name == genre)
+        )
+    return (
+        statement,
+        (func.lower(Artist.name, type_=Artist.name.type), Artist.id),
+        lambda artist: (artist.sort_name, artist.id),
+    )
+
+
+def show_listing():
+    """``(statement, sort_columns, row_key)`` of the /shows listing.
+
+    The venue and artist columns are fetched with the shows in one join.
+    """
+    statement = (
+        select(
+            Show.id,
+            Show.venue_id,
+            Venue.name.label("venue_name"),
+            Show.artist_id,
+            Artist.name.label("artist_name"),
+            Artist.image_link.label("artist_image_link"),
+            Show.start_time,
+        )
+        .join(Venue, Show.venue_id == Venue.id)
+        .join(Artist, Show.artist_id == Artist.id)
+    )
+    return (
+        statement,
+        (Show.start_time, Show.id),
+        lambda show: (show.start_time, show.id),
+    )
+
+
+def show_tiles(shows):
+    return dates.format_shows([show._asdict() for show in shows])
+
+
+def detail_statement(
+    model, owner_fk, counterpart, counterpart_fk, owner_id, past_before=None, limit=20
+):
+    """Load an artist or venue, its shows and their venue or artist in one query.
+
+    Upcoming shows are all returned. Past shows are returned most recent first,
+    at most ``limit`` (plus one, to tell whether there are more) of them,
+    starting after the ``past_before`` cursor. See :func:`detail_from_rows`.
+
+    The upcoming and the past side are separate selects, each with its own
+    ``start_time`` condition, so that on the partitioned shows table (see
+    partitions.py) the upcoming side only reads the current and future
+    partitions. Only ``shows`` is read: the past count is the owner's total of
+    shows, which its counters keep (see counters.py), minus the upcoming ones,
+    and the archived past shows are loaded by :func:`archive_statement` once
+    the past shows of ``shows`` run out, if the past count says there are
+    more than ``hot_past_shows_count``.
+    """
+    sort_columns = (Show.start_time, Show.id)
+    now = datetime.now()
+    upcoming = Show.start_time > now
+    listed_past = Show.start_time <= now
+    if past_before:
+        cursor = decode_cursor(past_before, sort_columns)
+        listed_past = and_(listed_past, tuple_(*sort_columns) < cursor)
+
+    def owner_shows(condition, is_upcoming):
+        return (
+            select(
+                Show.id.label("show_id"),
+                Show.start_time,
+                counterpart.id.label("counterpart_id"),
+                counterpart.name.label("counterpart_name"),
+                counterpart.image_link.label("counterpart_image_link"),
+                literal(is_upcoming).label("is_upcoming"),
+            )
+            .join(counterpart, counterpart.id == counterpart_fk)
+            .where(owner_fk == owner_id, condition)
+        )
+
+    def count(condition):
+        return (
+            select(func.count(Show.id))
+            .where(owner_fk == owner_id, condition)
+            .scalar_subquery()
+        )
+
+    past_page = (
+        owner_shows(listed_past, 0)
+        .order_by(Show.start_time.desc(), Show.id.desc())
+        .limit(limit + 1)
+        .subquery()
+    )
+    shows = union_all(owner_shows(upcoming, 1), select(past_page)).subquery()
+    return (
+        select(
+            model,
+            count(upcoming).label("upcoming_shows_count"),
+            (
+                model.upcoming_shows_count + model.past_shows_count - count(upcoming)
+            ).label("past_shows_count"),
+            count(Show.start_time <= now).label("hot_past_shows_count"),
+            shows.c.show_id,
+            shows.c.start_time,
+            shows.c.counterpart_id,
+            shows.c.counterpart_name,
+            shows.c.counterpart_image_link,
+            shows.c.is_upcoming,
+        )
+        .outerjoin(shows, true())
+        .where(model.id == owner_id)
+        .order_by(shows.c.start_time, shows.c.show_id)
+    )
+
+
+def reaches_archive(rows, limit=20):
+    """Whether a :func:`detail_statement` page ran out of past shows.
+
+    False when the owner has no archived shows, its past shows all being in
+    ``shows``.
+    """
+    if not rows:
+        return False
+    if (rows[0].past_shows_count or 0) <= (rows[0].hot_past_shows_count or 0):
+        return False
+    listed = sum(1 for row in rows if row.show_id is not None and not row.is_upcoming)
+    return listed <= limit
+
+
+def archive_statement(
+    owner_fk, counterpart, counterpart_fk, owner_id, past_before=None, limit=20
+):
+    """The archived past shows of a venue or artist page.
+
+    Same page as the past side of :func:`detail_statement` and the same
+    show columns, read from ``shows_archive``; its rows are added to the
+    rows of the detail statement.
+    """
+    owner_fk = getattr(ArchivedShow, owner_fk.key)
+    counterpart_fk = getattr(ArchivedShow, counterpart_fk.key)
+    sort_columns = (ArchivedShow.start_time, ArchivedShow.id)
+    statement = (
+        select(
+            ArchivedShow.id.label("show_id"),
+            ArchivedShow.start_time,
+            counterpart.id.label("counterpart_id"),
+            counterpart.name.label("counterpart_name"),
+            counterpart.image_link.label("counterpart_image_link"),
+            literal(0).label("is_upcoming"),
+        )
+        .join(counterpart, counterpart.id == counterpart_fk)
+        .where(owner_fk == owner_id)
+    )
+    if past_before:
+        cursor = decode_cursor(past_before, sort_columns)
+        statement = statement.where(tuple_(*sort_columns) < cursor)
+    return statement.order_by(
+        ArchivedShow.start_time.desc(), ArchivedShow.id.desc()
+    ).limit(limit + 1)
+
+
+def detail_from_rows(rows, prefix, limit=20):
+    """The owner and its shows from the rows of :func:`detail_statement`.
+
+    Returns None when the owner does not exist.
+    """
+    if not rows:
+        return None
+
+    # split past and upcoming in a single pass over the rows
+    upcoming_shows = []
+    past_shows = []
+    for row in rows:
+        if row.show_id is None:
+            continue
+        show = {
+            prefix + "_id": row.counterpart_id,
+            prefix + "_name": row.counterpart_name,
+            prefix + "_image_link": row.counterpart_image_link,
+            "start_time": row.start_time,
+        }
+        if row.is_upcoming:
+            upcoming_shows.append(show)
+        else:
+            past_shows.append((row.start_time, row.show_id, show))
+
+    # most recent first, the archived rows come after the others
+    past_shows.sort(key=lambda past_show: past_show[:2], reverse=True)
+    past_shows_next = None
+    if len(past_shows) > limit:
+        past_shows = past_shows[:limit]
+        past_shows_next = encode_cursor(past_shows[-1][:2])
+
+    past_shows = [show for _, _, show in past_shows]
+    dates.format_shows(upcoming_shows + past_shows)
+    return {
+        "owner": rows[0][0],
+        "upcoming_shows": upcoming_shows,
+        "upcoming_shows_count": rows[0].upcoming_shows_count or 0,
+        "past_shows": past_shows,
+        "past_shows_count": rows[0].past_shows_count or 0,
+        "past_shows_next": past_shows_next,
+    }
+
+
+# (statement arguments, show prefix) of the venue and artist pages
+VENUE_DETAIL = ((Venue, Show.venue_id, Artist, Show.artist_id), "artist")
+ARTIST_DETAIL = ((Artist, Show.artist_id, Venue, Show.venue_id), "venue")
+
+
+def paginate(statement, sort_columns, row_key):
+    """Keyset page of ``statement`` for the after/before/limit of the request."""
+    after, before, limit = page_args()
+    rows = db.session.execute(
+        keyset_statement(statement, sort_columns, after, before, limit)
+    ).all()
+    return page_from_rows(rows, row_key, after, before, limit)
+
+
+def detail_with_shows(detail, owner_id):
+    """Template data of a venue or artist page, see detail_statement."""
+    (model, *columns), prefix = detail
+    limit = current_app.config.get("PAST_SHOWS_PAGE_SIZE", 20)
+    past_before = request.args.get("past_before")
+    statement = detail_statement(
+        model, *columns, owner_id, past_before=past_before, limit=limit
+    )
+    rows = db.session.execute(statement).all()
+    if reaches_archive(rows, limit):
+        rows += db.session.execute(
+            archive_statement(*columns, owner_id, past_before, limit)
+        ).all()
+    details = detail_from_rows(rows, prefix, limit)
+    if details is None:
+        abort(404)
+    owner = details.pop("owner")
+    data = owner.venue_details() if model is Venue else owner.artist_info()
+    data.update(details)
+    return data
@@ -0,0 +1,120 @@
+# ----------------------------------------------------------------------------#
+# Read replicas.
+#
+# Every URL of SQLALCHEMY_REPLICA_URIS becomes a Flask-SQLAlchemy bind
+# ("replica_0", "replica_1", ...). A GET or HEAD request reads through one of
+# them, picked at random when the request starts; the other requests and the
+# CLI commands use the primary. Writes always go to the primary: a flush or
+# an INSERT/UPDATE/DELETE statement moves the rest of the request to it.
+#
+# After a write the client stays on the primary for REPLICA_STICKY_SECONDS
+# (a cookie holds the end of that window), so the page it is redirected to
+# shows its own change even when the replicas lag behind. The page cache
+# assumes the same lag, see cache.py.
+#
+# Locally, two SQLite files do: `flask sync-replicas` copies the primary
+# into the SQLite replicas.
+# ----------------------------------------------------------------------------#
+import math
+import random
+import time
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+READ_METHODS = ("GET", "HEAD")
+STICKY_COOKIE = "db_primary_until"
+
+
+def reading_replica():
+    """Bind key of the replica the current request reads from, or None."""
+    if not has_request_context():
+        return None
+    return g.get("_db_replica")
+
+
+def _wrote():
+    if has_request_context():
+        g._db_replica = None
+        g._db_wrote = True
+
+
+class RoutingSession(Session):
+    """Session of ``db.session``: the reads of a GET request go to its replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or getattr(clause, "is_dml", False):
+                _wrote()
+            else:
+                key = reading_replica()
+                if key is not None:
+                    return self._db.engines[key]
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, flush_context):
+    _wrote()
+
+
+class ReplicaRouter:
+    def __init__(self, app=None):
+        self.keys = []
+        self.sticky_seconds = 5
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Add the replica binds; must run before ``db.init_app(app)``."""
+        app.config.setdefault("SQLALCHEMY_REPLICA_URIS", [])
+        app.config.setdefault("REPLICA_STICKY_SECONDS", 5)
+        binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+        self.keys = []
+        for number, uri in enumerate(app.config["SQLALCHEMY_REPLICA_URIS"]):
+            key = f"replica_{number}"
+            binds[key] = uri
+            self.keys.append(key)
+        app.config["SQLALCHEMY_BINDS"] = binds
+        self.sticky_seconds = app.config["REPLICA_STICKY_SECONDS"]
+        app.extensions["replicas"] = self
+        if self.keys:
+            app.before_request(self._route)
+            app.after_request(self._stick)
+
+    def _route(self):
+        if request.method not in READ_METHODS:
+            return
+        try:
+            if float(request.cookies.get(STICKY_COOKIE, 0)) > time.time():
+                return
+        except ValueError:
+            pass
+        g._db_replica = random.choice(self.keys)
+
+    def _stick(self, response):
+        if g.get("_db_wrote") and self.sticky_seconds > 0:
+            response.set_cookie(
+                STICKY_COOKIE,
+                f"{time.time() + self.sticky_seconds:.3f}",
+                max_age=math.ceil(self.sticky_seconds),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def sync_sqlite(self, db):
+        """Copy the SQLite primary into every SQLite replica, return their keys."""
+        synced = []
+        with db.engine.connect() as source:
+            for key in self.keys:
+                engine = db.engines[key]
+                if engine.dialect.name != "sqlite":
+                    continue
+                with engine.connect() as target:
+                    source.connection.driver_connection.backup(
+                        target.connection.driver_connection
+                    )
+                synced.append(key)
+        return synced
@@ -0,0 +1,160 @@
+# ----------------------------------------------------------------------------#
+# Ranked venue/artist search.
+#
+# On Postgres the search uses the generated ``search_vector`` tsvector column
+# and the pg_trgm index on ``name`` (see migration 3b9c1f0a7e21). On SQLite it
+# uses the ``venues_fts``/``artists_fts`` FTS5 tables. When the database has
+# neither (checked once per database) the original ilike scan is used, so a
+# database without the migration still works.
+# ----------------------------------------------------------------------------#
+import re
+
+from sqlalchemy import func, inspect, literal_column, or_, select, text
+
+from models import Artist, Venue, db
+
+# columns matched by the search, in addition to the name
+SEARCH_COLUMNS = ("name", "city", "state", "genres")
+
+# FTS5 trigram tokens need at least three characters
+MIN_TRIGRAM_LENGTH = 3
+
+_search_indexes = {}
+
+
+def search_venues(term):
+    return _search(Venue, term)
+
+
+def search_artists(term):
+    return _search(Artist, term)
+
+
+def _search(model, term):
+    term = (term or "").strip()
+    if not term:
+        return []
+    connection = db.session.connection()
+    indexed = has_search_index(connection, model)
+    statement = search_statement(model, term, connection.dialect.name, indexed)
+    return db.session.execute(statement).all()
+
+
+def search_statement(model, term, dialect, indexed=False):
+    """The ranked search of ``term`` for the ``dialect`` of the database.
+
+    ``indexed`` tells whether the search index of ``model`` exists on that
+    database, see :func:`has_search_index`.
+    """
+    if dialect == "postgresql" and indexed:
+        return _postgres_statement(model, term)
+    if dialect == "sqlite" and indexed:
+        return _sqlite_statement(model, term)
+    return _ilike_statement(model, term)
+
+
+def search_ilike(model, term):
+    """The unindexed ``name ILIKE '%term%'`` search, kept as a fallback."""
+    return db.session.execute(_ilike_statement(model, term)).all()
+
+
+def _ilike_statement(model, term):
+    return (
+        select(model.id, model.name)
+        .where(model.name.ilike(f"%{term}%"))
+        .order_by(model.name, model.id)
+    )
+
+
+def _postgres_statement(model, term):
+    words = re.findall(r"\w+", term)
+    search_vector = literal_column(f"{model.__tablename__}.search_vector")
+    conditions = [model.name.ilike(f"%{term}%"), model.name.op("%")(term)]
+    rank = func.similarity(model.name, term)
+    if words:
+        # prefix match on every word: "music hop" -> 'music:* & hop:*'
+        query = func.to_tsquery("simple", " & ".join(f"{w}:*" for w in words))
+        conditions.append(search_vector.op("@@")(query))
+        rank = rank + func.ts_rank(search_vector, query)
+    return (
+        select(model.id, model.name)
+        .where(or_(*conditions))
+        .order_by(rank.desc(), model.id)
+    )
+
+
+def _sqlite_statement(model, term):
+    fts = _fts_table(model)
+    words = [w for w in term.split() if len(w) >= MIN_TRIGRAM_LENGTH]
+    if words:
+        match = " ".join('"{}"'.format(w.replace('"', '""')) for w in words)
+        where = f"{fts} MATCH :match"
+        params = {"match": match}
+    else:
+        # too short for the trigram index, scan the (small) fts table instead
+        where = " OR ".join(f"{fts}.{c} LIKE :like" for c in SEARCH_COLUMNS)
+        params = {"like": f"%{term}%"}
+    return text(
+        f"SELECT {fts}.rowid AS id, {fts}.name AS name FROM {fts} "
+        f"WHERE {where} ORDER BY bm25({fts}), {fts}.rowid"
+    ).bindparams(**params)
+
+
+def _fts_table(model):
+    return f"{model.__tablename__}_fts"
+
+
+def has_search_index(connection, model):
+    """Whether the search index of ``model`` exists, cached per database.
+
+    That is the ``search_vector`` column on Postgres and the FTS5 table on
+    SQLite; other databases have none.
+    """
+    key = (str(connection.engine.url), model.__tablename__)
+    if key not in _search_indexes:
+        dialect = connection.dialect.name
+        if dialect == "postgresql":
+            columns = inspect(connection).get_columns(model.__tablename__)
+            found = any(c["name"] == "search_vector" for c in columns)
+        elif dialect == "sqlite":
+            found = connection.dialect.has_table(connection, _fts_table(model))
+        else:
+            found = False
+        _search_indexes[key] = found
+    return _search_indexes[key]
+
+
+def sqlite_fts_ddl(table):
+    """Statements creating the FTS5 index of ``table`` and its sync triggers."""
+    fts = f"{table}_fts"
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+    old_values = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{columns}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values}); END",
+        # only the indexed columns: the counters and the version are updated far
+        # more often than these and must not rewrite the FTS row
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_au "
+        f"AFTER UPDATE OF {columns} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def build_sqlite_index():
+    """Create (or rebuild) the FTS5 tables of a SQLite database."""
+    for model in (Venue, Artist):
+        # replaced, an older database may have the trigger on every column
+        db.session.execute(text(f"DROP TRIGGER IF EXISTS {model.__tablename__}_fts_au"))
+        for statement in sqlite_fts_ddl(model.__tablename__):
+            db.session.execute(text(statement))
+    db.session.commit()
+    _search_indexes.clear()
@@ -0,0 +1,224 @@
+# ----------------------------------------------------------------------------#
+# Synthetic venues, artists and shows (``flask seed``).
+#
+# Fills the configured database with reproducible fake data for local
+# development and the benchmarks: cities, genres, and how many shows a venue
+# or artist gets all follow skewed (Zipf-like) distributions, so that a few
+# areas and performers are much busier than the rest, like on the real site.
+# Rows are inserted in batched transactions through bulk_import (COPY for
+# shows on Postgres/psycopg2), then the show counters are recomputed.
+# ----------------------------------------------------------------------------#
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+import bulk_import
+import counters
+from models import Artist, Show, Venue, artist_genres, db, venue_genres
+
+# (city, state, weight): weights roughly follow the size of the scene
+CITIES = [
+    ("New York", "NY", 30),
+    ("Los Angeles", "CA", 24),
+    ("Chicago", "IL", 14),
+    ("Nashville", "TN", 12),
+    ("Austin", "TX", 11),
+    ("San Francisco", "CA", 10),
+    ("Seattle", "WA", 8),
+    ("New Orleans", "LA", 8),
+    ("Atlanta", "GA", 7),
+    ("Boston", "MA", 6),
+    ("Portland", "OR", 5),
+    ("Denver", "CO", 5),
+    ("Philadelphia", "PA", 5),
+    ("Detroit", "MI", 4),
+    ("Miami", "FL", 4),
+    ("Minneapolis", "MN", 3),
+    ("Memphis", "TN", 3),
+    ("Oakland", "CA", 3),
+    ("Kansas City", "MO", 2),
+    ("Albuquerque", "NM", 1),
+]
+
+# the genres of forms.genres_choices in decreasing popularity
+GENRE_POPULARITY = [
+    "Rock n Roll",
+    "Pop",
+    "Hip-Hop",
+    "Jazz",
+    "Electronic",
+    "Alternative",
+    "R&B",
+    "Country",
+    "Folk",
+    "Blues",
+    "Punk",
+    "Soul",
+    "Heavy Metal",
+    "Funk",
+    "Reggae",
+    "Classical",
+    "Instrumental",
+    "Musical Theatre",
+    "Other",
+]
+
+VENUE_WORDS = (
+    ["The", "Old", "Blue", "Red", "Golden", "Velvet", "Electric", "Rusty", "Lucky"],
+    ["Musical", "Crystal", "Silver", "Neon", "Hidden", "Grand", "Little", "Wild"],
+    ["Hop", "Room", "Lounge", "Hall", "Cellar", "Garden", "Club", "Stage", "Barn"],
+)
+ARTIST_WORDS = (
+    ["The", "Guns N", "Matt", "Wild", "Midnight", "Sonic", "Velvet", "Paper"],
+    ["Sax", "Quevedo", "Petals", "Owls", "Rivers", "Echo", "Static", "Honey"],
+    ["Band", "Trio", "Collective", "Project", "Orchestra", "Quartet", "", "Club"],
+)
+STREETS = ["Main St", "Broadway", "Market St", "Valencia St", "2nd Ave", "Elm St"]
+
+# default sizes of ``flask seed --size`` and of the benchmarks
+SIZES = {
+    "small": {"venues": 100, "artists": 200, "shows": 2_000},
+    "medium": {"venues": 10_000, "artists": 20_000, "shows": 200_000},
+    "large": {"venues": 100_000, "artists": 200_000, "shows": 5_000_000},
+}
+
+
+def zipf_cum_weights(n, exponent=0.8):
+    """Cumulative weights of ``n`` items, the i-th weighing 1/(i+1)**exponent."""
+    return list(itertools.accumulate(1 / (i + 1) ** exponent for i in range(n)))
+
+
+def _genres(rng, genre_weights):
+    names = rng.choices(
+        GENRE_POPULARITY, cum_weights=genre_weights, k=rng.randint(1, 3)
+    )
+    return ",".join(dict.fromkeys(names))
+
+
+def _name(rng, words, number):
+    name = " ".join(w for w in (rng.choice(part) for part in words) if w)
+    return f"{name} {number}"
+
+
+def _phone(rng):
+    return f"{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(0, 9999):04}"
+
+
+def _venue(rng, number, city_weights, genre_weights):
+    city, state, _ = rng.choices(CITIES, cum_weights=city_weights)[0]
+    seeking = rng.random() < 0.3
+    return {
+        "name": _name(rng, VENUE_WORDS, number),
+        "city": city,
+        "state": state,
+        "address": f"{rng.randint(1, 3000)} {rng.choice(STREETS)}",
+        "phone": _phone(rng),
+        "genres": _genres(rng, genre_weights),
+        "image_link": f"https://picsum.photos/seed/venue{number}/400/300",
+        "facebook_link": f"https://www.facebook.com/venue{number}",
+        "website_link": f"https://venue{number}.example.com",
+        "seeking_talent": seeking,
+        "seeking_description": "Looking for local acts." if seeking else None,
+    }
+
+
+def _artist(rng, number, city_weights, genre_weights):
+    city, state, _ = rng.choices(CITIES, cum_weights=city_weights)[0]
+    seeking = rng.random() < 0.4
+    return {
+        "name": _name(rng, ARTIST_WORDS, number),
+        "city": city,
+        "state": state,
+        "phone": _phone(rng),
+        "genres": _genres(rng, genre_weights),
+        "image_link": f"https://picsum.photos/seed/artist{number}/400/300",
+        "facebook_link": f"https://www.facebook.com/artist{number}",
+        "website_link": f"https://artist{number}.example.com",
+        "seeking_venue": seeking,
+        "seeking_description": "Looking for shows." if seeking else "",
+    }
+
+
+def _insert_owners(model, make_row, count, rng, batch_size, progress):
+    """Insert ``count`` venues or artists and return their ids."""
+    city_weights = list(itertools.accumulate(weight for _, _, weight in CITIES))
+    genre_weights = zipf_cum_weights(len(GENRE_POPULARITY))
+    link_table, owner_column = (
+        (venue_genres, "venue_id") if model is Venue else (artist_genres, "artist_id")
+    )
+    first_id = db.session.scalar(select(db.func.coalesce(db.func.max(model.id), 0)))
+    done = 0
+    while done < count:
+        size = min(batch_size, count - done)
+        rows = [
+            make_row(rng, first_id + done + i + 1, city_weights, genre_weights)
+            for i in range(size)
+        ]
+        batch_first_id = db.session.scalar(
+            select(db.func.coalesce(db.func.max(model.id), 0))
+        )
+        bulk_import.insert_rows(model.__table__, rows)
+        bulk_import.link_genres(model, link_table, owner_column, batch_first_id)
+        db.session.commit()
+        done += size
+        progress(model.__tablename__, done, count)
+    return db.session.scalars(
+        select(model.id).where(model.id > first_id).order_by(model.id)
+    ).all()
+
+
+def _insert_shows(venue_ids, artist_ids, count, rng, batch_size, progress):
+    # popular venues and artists get most of the shows
+    venue_ids = list(venue_ids)
+    artist_ids = list(artist_ids)
+    rng.shuffle(venue_ids)
+    rng.shuffle(artist_ids)
+    venue_weights = zipf_cum_weights(len(venue_ids))
+    artist_weights = zipf_cum_weights(len(artist_ids))
+    # two years of history and a year of upcoming shows, in the evening
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    first_day = now - timedelta(days=730)
+    done = 0
+    while done < count:
+        size = min(batch_size, count - done)
+        venues = rng.choices(venue_ids, cum_weights=venue_weights, k=size)
+        artists = rng.choices(artist_ids, cum_weights=artist_weights, k=size)
+        rows = [
+            {
+                "venue_id": venue_id,
+                "artist_id": artist_id,
+                "start_time": first_day.replace(hour=rng.randint(18, 23))
+                + timedelta(days=rng.randint(0, 1095)),
+            }
+            for venue_id, artist_id in zip(venues, artists)
+        ]
+        bulk_import.insert_rows(Show.__table__, rows)
+        db.session.commit()
+        done += size
+        progress("shows", done, count)
+
+
+def generate(
+    venues, artists, shows, seed=0, batch_size=5000, progress=lambda *args: None
+):
+    """Add ``venues``, ``artists`` and ``shows`` synthetic rows.
+
+    The same ``seed`` on the same (empty) database gives the same data.
+    ``progress`` is called with ``(table, done, total)`` after every batch.
+    Returns the elapsed time in seconds.
+    """
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    venue_ids = _insert_owners(Venue, _venue, venues, rng, batch_size, progress)
+    artist_ids = _insert_owners(Artist, _artist, artists, rng, batch_size, progress)
+    if shows and not (venue_ids and artist_ids):
+        venue_ids = venue_ids or db.session.scalars(select(Venue.id)).all()
+        artist_ids = artist_ids or db.session.scalars(select(Artist.id)).all()
+    if shows and venue_ids and artist_ids:
+        _insert_shows(venue_ids, artist_ids, shows, rng, batch_size, progress)
+    # COPY/executemany bypass the ORM events that maintain the counters
+    counters.rebuild()
+    return time.perf_counter() - started
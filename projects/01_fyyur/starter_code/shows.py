@@ -0,0 +1,59 @@
+# ----------------------------------------------------------------------------#
+# Show views: listing and create.
+# ----------------------------------------------------------------------------#
+from flask import Blueprint, flash, render_template, request
+
+import queries
+from extensions import page_cache
+from models import Show, db
+
+blueprint = Blueprint("shows", __name__)
+
+
+@blueprint.route("/shows")
+@page_cache.cached(lambda: ("shows",))
+def shows():
+    # displays list of shows at /shows
+    # venue and artist columns are fetched with the shows in one joined query
+    page = queries.paginate(*queries.show_listing())
+    return render_template(
+        "pages/shows.html", shows=queries.show_tiles(page.items), page=page
+    )
+
+
+@blueprint.route("/shows/create")
+def create_shows():
+    from forms import ShowForm
+
+    # renders form. do not touch.
+    form = ShowForm()
+    return render_template("forms/new_show.html", form=form)
+
+
+@blueprint.route("/shows/create", methods=["POST"])
+def create_show_submission():
+    import dateutil.parser
+
+    # called to create new shows in the db, upon submitting new show listing form
+    # TODO: insert form data as a new Show record in the db, instead
+
+    artist_id = request.form.get("artist_id")
+    venue_id = request.form.get("venue_id")
+    start_time = request.form.get("start_time")
+    start_time = dateutil.parser.parse(start_time)
+
+    show = Show(artist_id=artist_id, venue_id=venue_id, start_time=start_time)
+    try:
+        db.session.add(show)
+        db.session.commit()
+        page_cache.invalidate(
+            "shows", "venues", f"artist:{artist_id}", f"venue:{venue_id}"
+        )
+        flash("Show created successfull!")
+    except:
+        db.session.rollback()
+        flash("Show could not be created")
+    finally:
+        db.session.close()
+    # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+    return render_template("pages/home.html")
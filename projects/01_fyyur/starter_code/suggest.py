@@ -0,0 +1,122 @@
+# ----------------------------------------------------------------------------#
+# In-process prefix index of artist and venue names for the typeahead.
+#
+# Each name is stored once per word, so "hop" finds "The Musical Hop". The
+# index is loaded from the database on first use and then kept current by the
+# create/edit/delete views; lookups never touch the database. Every worker
+# process holds its own copy, and only the worker that handled a write sees
+# it at once: the others reload their copy once it is older than
+# SUGGEST_INDEX_MAX_AGE seconds, on the next lookup.
+# ----------------------------------------------------------------------------#
+import bisect
+import threading
+import time
+
+from models import Artist, Venue, db
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._keys = []  # sorted (lowercase suffix, kind, id)
+        self._names = {}  # (kind, id) -> name
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.loaded_at = None
+
+    @staticmethod
+    def _suffixes(name):
+        words = name.lower().split()
+        return {" ".join(words[i:]) for i in range(len(words))}
+
+    def _insert(self, kind, id, name):
+        self._names[(kind, id)] = name
+        for suffix in self._suffixes(name):
+            bisect.insort(self._keys, (suffix, kind, id))
+
+    def _delete(self, kind, id):
+        name = self._names.pop((kind, id), None)
+        if name is None:
+            return
+        for suffix in self._suffixes(name):
+            i = bisect.bisect_left(self._keys, (suffix, kind, id))
+            if i < len(self._keys) and self._keys[i] == (suffix, kind, id):
+                del self._keys[i]
+
+    def load(self, entries):
+        """Replace the contents with ``(kind, id, name)`` entries."""
+        names = {(kind, id): name for kind, id, name in entries if name}
+        keys = sorted(
+            (suffix, kind, id)
+            for (kind, id), name in names.items()
+            for suffix in self._suffixes(name)
+        )
+        with self._lock:
+            self._names, self._keys = names, keys
+            self.loaded = True
+            self.loaded_at = time.monotonic()
+
+    def age(self):
+        """Seconds since the last load, None before the first one."""
+        if self.loaded_at is None:
+            return None
+        return time.monotonic() - self.loaded_at
+
+    def add(self, kind, id, name):
+        with self._lock:
+            self._delete(kind, id)
+            if name:
+                self._insert(kind, id, name)
+
+    def remove(self, kind, id):
+        with self._lock:
+            self._delete(kind, id)
+
+    def suggest(self, prefix, limit=10):
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        with self._lock:
+            i = bisect.bisect_left(self._keys, (prefix,))
+            while i < len(self._keys) and len(results) < limit:
+                suffix, kind, id = self._keys[i]
+                if not suffix.startswith(prefix):
+                    break
+                if (kind, id) not in seen:
+                    seen.add((kind, id))
+                    results.append(
+                        {"type": kind, "id": id, "name": self._names[(kind, id)]}
+                    )
+                i += 1
+        return results
+
+
+index = PrefixIndex()
+
+
+def suggest(prefix, limit=10, max_age=None):
+    """Names matching ``prefix``, reloading an index older than ``max_age``."""
+    age = index.age()
+    if age is None or (max_age and age > max_age):
+        reload()
+    return index.suggest(prefix, limit)
+
+
+def reload():
+    artists = db.session.query(Artist.id, Artist.name)
+    venues = db.session.query(Venue.id, Venue.name)
+    entries = [("artist", id, name) for id, name in artists]
+    entries += [("venue", id, name) for id, name in venues]
+    index.load(entries)
+
+
+def add(kind, id, name):
+    # before the first load the full reload will pick the row up
+    if index.loaded:
+        index.add(kind, id, name)
+
+
+def remove(kind, id):
+    if index.loaded:
+        index.remove(kind, id)
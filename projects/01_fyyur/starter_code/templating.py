@@ -0,0 +1,61 @@
+# ----------------------------------------------------------------------------#
+# Jinja bytecode cache and template precompilation.
+#
+# Compiled templates are kept on disk (JINJA_BYTECODE_CACHE_DIR, by default
+# instance/jinja_cache), so a new worker loads them instead of compiling every
+# template on its first requests. `flask precompile-templates` fills the cache
+# at deploy time. Jinja checks the source checksum of every cached template,
+# so an edited template is recompiled, never served stale.
+#
+# Async templates (asgi.py) compile to different code than the sync ones for
+# the same source, so they get their own cache files.
+# ----------------------------------------------------------------------------#
+import os
+
+from jinja2 import FileSystemBytecodeCache
+
+SYNC_PATTERN = "__jinja2_%s.cache"
+ASYNC_PATTERN = "__jinja2_async_%s.cache"
+# only these are templates, templates/ also holds some css
+TEMPLATE_EXTENSIONS = ("html",)
+
+
+def cache_dir(app):
+    """The bytecode cache directory of ``app``, None when disabled."""
+    directory = app.config.get("JINJA_BYTECODE_CACHE_DIR")
+    if directory is None:
+        directory = os.path.join(app.instance_path, "jinja_cache")
+    return directory or None
+
+
+def init_bytecode_cache(app):
+    directory = cache_dir(app)
+    if directory is None:
+        return
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError as e:
+        app.logger.warning("Jinja bytecode cache disabled: %s", e)
+        return
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory, SYNC_PATTERN)
+
+
+def async_environment(app):
+    """An async overlay of ``app.jinja_env``, with its own bytecode cache."""
+    environment = app.jinja_env.overlay(enable_async=True)
+    if app.jinja_env.bytecode_cache is not None:
+        environment.bytecode_cache = FileSystemBytecodeCache(
+            app.jinja_env.bytecode_cache.directory, ASYNC_PATTERN
+        )
+    return environment
+
+
+def precompile(environment):
+    """Compile every template of ``environment``, return their names.
+
+    Templates already in the bytecode cache are only loaded.
+    """
+    names = environment.list_templates(extensions=TEMPLATE_EXTENSIONS)
+    for name in names:
+        environment.get_template(name)
+    return names
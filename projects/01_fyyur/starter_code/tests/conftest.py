@@ -0,0 +1,107 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from factory import create_app  # noqa: E402
+from models import Artist, Show, Venue, db  # noqa: E402
+
+STATES = ("CA", "NY", "TX", "WA")
+
+
+@pytest.fixture
+def app_settings():
+    """Settings of the test app, overridden by the tests that need others."""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, app_settings):
+    settings = {name: getattr(config, name) for name in dir(config) if name.isupper()}
+    settings.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'fyyur.sqlite'}",
+        SQLALCHEMY_REPLICA_URIS=[],
+        PAGE_CACHE_BACKEND="null",
+        JINJA_BYTECODE_CACHE_DIR="",
+    )
+    settings.update(app_settings)
+    app = create_app(type("TestingConfig", (), settings))
+    with app.app_context():
+        # the replicas are copies of the primary, see sync_sqlite
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def statements(app):
+    """The SQL statements run on the app's database, cleared by the tests."""
+    executed = []
+
+    def record(connection, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(db.engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def seed(app):
+    """Add venues, artists and shows; the shows go to the existing ones."""
+
+    def seed(venues=0, artists=0, shows=0):
+        for _ in range(venues):
+            number = Venue.query.count() + 1
+            db.session.add(
+                Venue(
+                    name=f"Venue {number}",
+                    city=f"City {number % 3}",
+                    state=STATES[number % len(STATES)],
+                    address=f"{number} Main Street",
+                    phone="123-456-7890",
+                    genres="Jazz",
+                )
+            )
+            db.session.flush()
+        for _ in range(artists):
+            number = Artist.query.count() + 1
+            db.session.add(
+                Artist(
+                    name=f"Artist {number}",
+                    city="San Francisco",
+                    state="CA",
+                    phone="123-456-7890",
+                    genres="Jazz",
+                    seeking_description="",
+                )
+            )
+            db.session.flush()
+        venue_ids = [id for id, in db.session.query(Venue.id)]
+        artist_ids = [id for id, in db.session.query(Artist.id)]
+        now = datetime.now()
+        for number in range(shows):
+            # every other show is in the past
+            days = (number + 1) * (-1 if number % 2 else 1)
+            db.session.add(
+                Show(
+                    venue_id=venue_ids[number % len(venue_ids)],
+                    artist_id=artist_ids[number % len(artist_ids)],
+                    start_time=now + timedelta(days=days),
+                )
+            )
+        db.session.commit()
+
+    return seed
@@ -0,0 +1,51 @@
+from models import Venue, db
+
+
+def revalidate(client, path, etag):
+    return client.get(path, headers={"If-None-Match": f'"{etag}"'})
+
+
+def test_a_matching_etag_is_answered_with_304(client, seed):
+    seed(venues=3)
+    for path in ("/api/v1/venues", "/api/v1/venues/1"):
+        response = client.get(path)
+        etag = response.get_etag()[0]
+        assert response.status_code == 200
+
+        response = revalidate(client, path, etag)
+        assert response.status_code == 304
+        assert response.data == b""
+        assert response.get_etag()[0] == etag
+
+
+def test_an_update_changes_the_etags(client, seed):
+    seed(venues=3)
+    etags = {
+        path: client.get(path).get_etag()[0]
+        for path in ("/api/v1/venues", "/api/v1/venues/1", "/api/v1/venues/2")
+    }
+    venue = db.session.get(Venue, 1)
+    venue.name = "Renamed Venue"
+    db.session.commit()
+    assert venue.version == 2
+
+    response = revalidate(client, "/api/v1/venues/1", etags["/api/v1/venues/1"])
+    assert response.status_code == 200
+    assert response.json["name"] == "Renamed Venue"
+    assert (
+        revalidate(client, "/api/v1/venues", etags["/api/v1/venues"]).status_code == 200
+    )
+    assert (
+        revalidate(client, "/api/v1/venues/2", etags["/api/v1/venues/2"]).status_code
+        == 304
+    )
+
+
+def test_a_new_row_changes_the_etag_of_the_last_page(client, seed):
+    seed(venues=2)
+    path = "/api/v1/venues?limit=2"
+    etag = client.get(path).get_etag()[0]
+    seed(venues=1)
+    response = revalidate(client, path, etag)
+    assert response.status_code == 200
+    assert response.json["next"]
@@ -0,0 +1,64 @@
+import re
+from datetime import datetime, timedelta
+
+import archive
+from models import ArchivedShow, Show, db
+
+
+def venue_pages(client, venue_id):
+    """Every page of a venue, following its "load more" links."""
+    pages = []
+    url = f"/venues/{venue_id}"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        page = response.get_data(as_text=True)
+        pages.append(page)
+        more = re.search(r'href="([^"]*past_before=[^"]*)"', page)
+        url = more and more.group(1).replace("&amp;", "&")
+    return pages
+
+
+def test_archived_shows_are_paged_into(app, client, statements, seed):
+    app.config["PAST_SHOWS_PAGE_SIZE"] = 3
+    seed(venues=1, artists=3, shows=30)
+    before = venue_pages(client, 1)
+    assert len(before) > 3
+
+    months, moved = archive.archive_shows(datetime.now() - timedelta(days=10))
+    assert moved == db.session.query(ArchivedShow).count() > 0
+    assert venue_pages(client, 1) == before
+
+    # the first page has enough past shows left in shows
+    statements.clear()
+    client.get("/venues/1")
+    assert len(statements) == 1
+
+
+def test_the_archive_is_not_read_without_archived_shows(client, statements, seed):
+    seed(venues=1, artists=1, shows=4)
+    statements.clear()
+    client.get("/venues/1")
+    assert len(statements) == 1
+
+
+def test_archiving_again_after_the_last_id_was_archived(app, seed):
+    seed(venues=1, artists=1, shows=4)
+    last = db.session.query(Show).order_by(Show.id.desc()).first()
+    last.start_time = datetime.now() - timedelta(days=400)
+    db.session.commit()
+    last_id = last.id
+    archive.archive_shows(datetime.now() - timedelta(days=365))
+    assert db.session.get(ArchivedShow, last_id) is not None
+
+    # the new show must not take the id of the archived one
+    show = Show(venue_id=1, artist_id=1, start_time=datetime.now())
+    db.session.add(show)
+    db.session.commit()
+    assert show.id > last_id
+
+    show.start_time = datetime.now() - timedelta(days=400)
+    db.session.commit()
+    months, moved = archive.archive_shows(datetime.now() - timedelta(days=365))
+    assert moved == 1
+    assert db.session.query(ArchivedShow).count() == 2
@@ -0,0 +1,94 @@
+import json
+
+import bulk_import
+from models import Artist, Show, Venue, db
+
+VENUE = {
+    "name": "The Musical Hop",
+    "city": "San Francisco",
+    "state": "CA",
+    "address": "1015 Folsom Street",
+    "phone": "123-123-1234",
+    "genres": "Jazz,Reggae",
+    "facebook_link": "https://www.facebook.com/TheMusicalHop",
+}
+ARTIST = {
+    "name": "Guns N Petals",
+    "city": "San Francisco",
+    "state": "CA",
+    "phone": "326-123-5000",
+    "genres": ["Rock n Roll"],
+    "facebook_link": "https://www.facebook.com/GunsNPetals",
+}
+
+
+def write(path, lines):
+    path.write_text("".join(line + "\n" for line in lines))
+    return str(path)
+
+
+def test_invalid_csv_rows_are_reported_and_skipped(app, tmp_path):
+    columns = list(VENUE)
+    without_phone = [c for c in columns if c != "phone"]
+    path = write(
+        tmp_path / "venues.csv",
+        [
+            ",".join(columns),
+            ",".join(f'"{VENUE[c]}"' for c in columns),
+            ",".join(f'"{VENUE[c]}"' if c != "state" else "XX" for c in columns),
+        ],
+    )
+    report = bulk_import.import_file("venues", path)
+    assert report.inserted == 1
+    assert [number for number, _ in report.errors] == [3]
+    assert report.errors[0][1].startswith("state:")
+
+    # no phone column at all: every row is an error, not a crash
+    path = write(
+        tmp_path / "no_phone.csv",
+        [",".join(without_phone), ",".join(f'"{VENUE[c]}"' for c in without_phone)],
+    )
+    report = bulk_import.import_file("venues", path)
+    assert report.inserted == 0
+    assert report.errors == [(2, "phone: Invalid phone number")]
+    assert db.session.query(Venue).count() == 1
+
+
+def test_malformed_ndjson_lines_are_row_errors(app, tmp_path):
+    path = write(
+        tmp_path / "artists.ndjson",
+        [
+            json.dumps(ARTIST),
+            '{"name": "broken",',
+            "[1, 2]",
+            '"x"',
+            json.dumps(dict(ARTIST, name="The Wild Sax Band", phone=None)),
+            json.dumps(dict(ARTIST, name="Matt Quevedo")),
+        ],
+    )
+    report = bulk_import.import_file("artists", path)
+    assert report.inserted == 2
+    errors = dict(report.errors)
+    assert sorted(errors) == [2, 3, 4, 5]
+    assert errors[2].startswith("invalid JSON")
+    assert errors[3].startswith("not an object")
+    assert errors[5] == "phone: Invalid phone number"
+    assert db.session.query(Artist).count() == 2
+
+
+def test_show_start_times_are_iso_8601(app, tmp_path, seed):
+    seed(venues=1, artists=1)
+    rows = [
+        {"venue_id": 1, "artist_id": 1, "start_time": "2035-05-21T21:30:00"},
+        {"venue_id": 1, "artist_id": 1, "start_time": "2035-05-22 21:30:00"},
+        {"venue_id": 1, "artist_id": 1, "start_time": "21/05/2035"},
+        {"venue_id": 1, "artist_id": 99, "start_time": "2035-05-23T21:30:00"},
+    ]
+    path = tmp_path / "shows.json"
+    path.write_text(json.dumps(rows))
+    report = bulk_import.import_file("shows", str(path))
+    assert report.inserted == 2
+    errors = dict(report.errors)
+    assert errors[3].startswith("start_time: not an ISO 8601 date and time")
+    assert errors[4] == "artist id 99 not found"
+    assert db.session.query(Show).count() == 2
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from cache import FileSystemBackend
+from extensions import page_cache
+
+
+@pytest.fixture
+def cached(app, tmp_path):
+    """The app with the shared (filesystem) page cache."""
+    app.config.update(PAGE_CACHE_BACKEND="filesystem", PAGE_CACHE_DIR=tmp_path / "pc")
+    page_cache.init_app(app)
+    return app
+
+
+def test_pages_are_served_from_the_cache_until_a_write(cached, client, seed):
+    seed(venues=1, artists=1)
+    first = client.get("/venues").data
+    hits = page_cache.hits
+    assert client.get("/venues").data == first
+    assert page_cache.hits == hits + 1
+
+    client.post(
+        "/venues/create",
+        data={
+            "name": "The Late Venue",
+            "city": "Austin",
+            "state": "TX",
+            "address": "1 Late Street",
+            "phone": "123-456-7890",
+            "genres": "Jazz",
+        },
+    )
+    assert b"The Late Venue" in client.get("/venues").data
+
+
+def test_a_show_invalidates_the_pages_of_its_venue_and_artist(cached, client, seed):
+    seed(venues=2, artists=1)
+    for path in ("/venues/1", "/venues/2", "/artists/1", "/shows"):
+        client.get(path)
+    misses = page_cache.misses
+    start_time = datetime.now() + timedelta(days=2)
+    client.post(
+        "/shows/create",
+        data={
+            "artist_id": 1,
+            "venue_id": 1,
+            "start_time": f"{start_time:%Y-%m-%d %H:%M}",
+        },
+    )
+
+    assert b"Artist 1" in client.get("/venues/1").data
+    assert b"Venue 1" in client.get("/artists/1").data
+    assert b"Venue 1" in client.get("/shows").data
+    assert page_cache.misses == misses + 3
+    client.get("/venues/2")
+    assert page_cache.misses == misses + 3
+
+
+def test_invalidations_reach_the_other_processes(cached, client, seed):
+    seed(venues=1)
+    client.get("/venues")
+    # another worker of the same host
+    other = FileSystemBackend(page_cache.backend.directory)
+    before = other.version("venues")
+    page_cache.invalidate("venues")
+    assert other.version("venues") > before
+
+
+def test_the_directory_is_pruned_every_few_writes(tmp_path):
+    backend = FileSystemBackend(tmp_path, max_entries=5, prune_every=10)
+    for number in range(9):
+        backend.set(f"page:{number}", number)
+    assert len(backend) == 9
+    backend.set("page:9", 9)
+    assert len(backend) == 9
+    assert backend.evictions == 1
+
+
+def test_the_stats_tell_the_counters_of_this_process(cached, client, seed):
+    seed(venues=1)
+    client.get("/venues")
+    stats = client.get("/cache/stats").json
+    assert stats["shared"] is True
+    assert stats["entries"] == 1
+    assert stats["process"]["misses"] == 1
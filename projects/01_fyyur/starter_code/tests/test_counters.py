@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+import archive
+import counters
+from models import ArchivedShow, Artist, Show, Venue, db
+
+
+def stored(model, id):
+    row = db.session.get(model, id)
+    db.session.refresh(row)
+    return row.upcoming_shows_count, row.past_shows_count
+
+
+def add_show(venue_id, artist_id, days):
+    show = Show(
+        venue_id=venue_id,
+        artist_id=artist_id,
+        start_time=datetime.now() + timedelta(days=days),
+    )
+    db.session.add(show)
+    db.session.commit()
+    return show
+
+
+def test_inserts_and_deletes_adjust_the_counters(app, seed):
+    seed(venues=1, artists=1)
+    upcoming = add_show(1, 1, days=3)
+    past = add_show(1, 1, days=-3)
+    assert stored(Venue, 1) == stored(Artist, 1) == (1, 1)
+
+    db.session.delete(upcoming)
+    db.session.commit()
+    assert stored(Venue, 1) == stored(Artist, 1) == (0, 1)
+    db.session.delete(past)
+    db.session.commit()
+    assert stored(Venue, 1) == stored(Artist, 1) == (0, 0)
+    assert counters.check() == []
+
+
+def test_deleting_a_venue_counts_down_its_artists(app, seed):
+    seed(venues=2, artists=1)
+    add_show(1, 1, days=3)
+    add_show(1, 1, days=-3)
+    add_show(2, 1, days=-5)
+    archive.archive_shows(datetime.now() - timedelta(days=4))
+    assert db.session.query(ArchivedShow).count() == 1
+
+    db.session.delete(db.session.get(Venue, 2))
+    db.session.commit()
+    assert stored(Artist, 1) == (1, 1)
+    db.session.delete(db.session.get(Venue, 1))
+    db.session.commit()
+    assert stored(Artist, 1) == (0, 0)
+    assert counters.check() == []
+
+
+def test_counters_check_reports_the_mismatches(app, seed):
+    seed(venues=1, artists=1, shows=4)
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["counters", "check"])
+    assert result.exit_code == 0
+    assert "All counters are consistent." in result.output
+
+    db.session.execute(db.update(Venue).values(past_shows_count=7))
+    db.session.commit()
+    result = runner.invoke(args=["counters", "check"])
+    assert result.exit_code == 1
+    assert "venues 1: stored upcoming/past (2, 7), actual (2, 2)" in result.output
+
+    result = runner.invoke(args=["counters", "rebuild"])
+    assert result.exit_code == 0
+    assert counters.check() == []
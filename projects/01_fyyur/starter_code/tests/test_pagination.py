@@ -0,0 +1,37 @@
+import pytest
+
+from pagination import encode_cursor
+
+
+@pytest.mark.parametrize(
+    "path, values",
+    [
+        ("/api/v1/venues", ["1"]),
+        ("/api/v1/venues", [True]),
+        ("/api/v1/venues", [1.5]),
+        ("/api/v1/venues", [1, 2]),
+        ("/venues", [1, "City 1", 1]),
+        ("/artists", [{"name": "a"}, 1]),
+        ("/shows", ["not a date", 1]),
+    ],
+)
+def test_cursors_of_the_wrong_type_are_rejected(client, seed, path, values):
+    seed(venues=2, artists=2, shows=2)
+    assert (
+        client.get(path, query_string={"after": encode_cursor(values)}).status_code
+        == 400
+    )
+
+
+def test_cursors_of_the_right_type_are_accepted(client, seed):
+    seed(venues=3, artists=3, shows=3)
+    for path, values in (
+        ("/venues", ["CA", "City 1", 1]),
+        ("/artists", ["artist 1", 1]),
+        ("/shows", ["2020-01-01T20:00:00", 1]),
+    ):
+        response = client.get(path, query_string={"after": encode_cursor(values)})
+        assert response.status_code == 200
+    page = client.get("/api/v1/venues", query_string={"limit": 1}).json
+    response = client.get("/api/v1/venues", query_string={"after": page["next"]})
+    assert [venue["id"] for venue in response.json["data"]] == [2, 3]
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+import partitions
+from models import ArchivedShow, Show, db
+
+
+def retire_old_months():
+    with db.engine.begin() as connection:
+        return partitions.retire(connection, datetime.now() - timedelta(days=60))
+
+
+def test_retire_moves_the_old_months_to_the_archive(app, seed):
+    seed(venues=1, artists=1, shows=200)
+    old = Show.start_time < partitions.month_start(datetime.now() - timedelta(days=60))
+    count = db.session.query(Show).filter(old).count()
+    assert count
+
+    assert retire_old_months()
+    assert db.session.query(Show).filter(old).count() == 0
+    assert db.session.query(ArchivedShow).count() == count
+
+
+def test_retire_again_after_the_last_id_was_retired(app, seed):
+    seed(venues=1, artists=1, shows=3)
+    last = db.session.query(Show).order_by(Show.id.desc()).first()
+    last.start_time = datetime.now() - timedelta(days=400)
+    db.session.commit()
+    last_id = last.id
+    retire_old_months()
+
+    show = Show(venue_id=1, artist_id=1, start_time=datetime.now())
+    db.session.add(show)
+    db.session.commit()
+    assert show.id > last_id
+
+    show.start_time = datetime.now() - timedelta(days=400)
+    db.session.commit()
+    retire_old_months()
+    assert db.session.query(ArchivedShow).count() == 2
@@ -0,0 +1,61 @@
+# The listings and the venue and artist pages, as the app builds them, must be
+# planned on the access-path indexes (see migration a4e7b25c9d13) and, for the
+# listings, read in index order without sorting.
+from datetime import datetime
+
+import pytest
+
+import queries
+from models import db
+from pagination import encode_cursor, keyset_statement
+
+NOW = datetime(2026, 1, 1, 20, 0)
+
+LISTINGS = [
+    (queries.venue_listing, "ix_venues_state_city", ["CA", "San Francisco", 3]),
+    (queries.artist_listing, "ix_artists_lower_name", ["the wild sax band", 2]),
+    (queries.show_listing, "ix_shows_start_time_id", [NOW, 5]),
+]
+
+DETAILS = [
+    (queries.VENUE_DETAIL, "ix_shows_venue_id_start_time"),
+    (queries.ARTIST_DETAIL, "ix_shows_artist_id_start_time"),
+]
+
+
+def query_plan(statement):
+    """EXPLAIN QUERY PLAN of ``statement`` with its bound parameters.
+
+    The parameters are not inlined: SQLite only uses an expression index for
+    the same expression, and a bound parameter is not the same as a literal.
+    """
+    compiled = statement.compile(dialect=db.engine.dialect)
+    parameters = compiled.construct_params()
+    rows = db.session.connection().exec_driver_sql(
+        "EXPLAIN QUERY PLAN " + str(compiled),
+        tuple(parameters[name] for name in compiled.positiontup),
+    )
+    return "\n".join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize("listing, index, cursor", LISTINGS)
+@pytest.mark.parametrize("direction", [None, "after", "before"])
+def test_listing_pages_are_read_in_index_order(app, listing, index, cursor, direction):
+    statement, sort_columns, _ = listing()
+    seek = {direction: encode_cursor(cursor)} if direction else {}
+    plan = query_plan(keyset_statement(statement, sort_columns, limit=50, **seek))
+    assert index in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+    if direction:
+        # seeking to the cursor, not scanning the index up to it
+        assert plan.startswith("SEARCH"), plan
+
+
+@pytest.mark.parametrize("detail, index", DETAILS)
+@pytest.mark.parametrize("past_before", [None, encode_cursor([NOW, 5])])
+def test_detail_shows_are_read_from_the_owner_index(app, detail, index, past_before):
+    (model, *columns), _ = detail
+    statement = queries.detail_statement(model, *columns, 1, past_before=past_before)
+    plan = query_plan(statement)
+    assert index in plan, plan
+    assert "SCAN shows" not in plan, plan
@@ -0,0 +1,54 @@
+import pytest
+
+from extensions import replicas
+from models import Venue, db
+from replicas import STICKY_COOKIE
+
+
+@pytest.fixture
+def app_settings(tmp_path):
+    return {"SQLALCHEMY_REPLICA_URIS": [f"sqlite:///{tmp_path / 'replica.sqlite'}"]}
+
+
+@pytest.fixture
+def replica(app, seed):
+    """The replica, in sync with the primary's venues until renamed there."""
+    seed(venues=2)
+    assert replicas.sync_sqlite(db) == ["replica_0"]
+    db.session.execute(db.update(Venue).values(name=Venue.name + " (primary)"))
+    db.session.commit()
+    return db.engines["replica_0"]
+
+
+def names(client, path="/api/v1/venues"):
+    return [venue["name"] for venue in client.get(path).json["data"]]
+
+
+def test_get_requests_read_the_replica(replica, client):
+    assert names(client) == ["Venue 1", "Venue 2"]
+    assert b"Venue 1 (primary)" not in client.get("/venues/1").data
+    # the CLI commands and the other methods use the primary
+    assert db.session.get(Venue, 1).name == "Venue 1 (primary)"
+
+
+def test_writes_go_to_the_primary_and_stick_the_client_to_it(replica, client):
+    response = client.post(
+        "/venues/create",
+        data={
+            "name": "The New Venue",
+            "city": "Austin",
+            "state": "TX",
+            "address": "1 New Street",
+            "phone": "123-456-7890",
+            "genres": "Jazz",
+        },
+    )
+    assert STICKY_COOKIE in response.headers["Set-Cookie"]
+    assert db.session.query(Venue).filter_by(name="The New Venue").count() == 1
+    with replica.connect() as connection:
+        assert connection.scalar(db.select(db.func.count(Venue.id))) == 2
+
+    # the client now reads its own write
+    assert names(client) == ["Venue 1 (primary)", "Venue 2 (primary)", "The New Venue"]
+    client.delete_cookie(STICKY_COOKIE)
+    assert names(client) == ["Venue 1", "Venue 2"]
@@ -0,0 +1,23 @@
+import search
+from models import Venue, db
+
+
+def test_postgres_without_search_vector_falls_back_to_ilike():
+    statement = search.search_statement(Venue, "jazz", "postgresql", indexed=False)
+    assert "search_vector" not in str(statement)
+    assert str(statement) == str(search._ilike_statement(Venue, "jazz"))
+
+
+def test_sqlite_without_fts_table_falls_back_to_ilike(app, seed):
+    seed(venues=12)
+    assert not search.has_search_index(db.session.connection(), Venue)
+    assert [name for _, name in search.search_venues("Venue 1")] == [
+        "Venue 1",
+        "Venue 10",
+        "Venue 11",
+        "Venue 12",
+    ]
+
+    search.build_sqlite_index()
+    assert search.has_search_index(db.session.connection(), Venue)
+    assert {name for _, name in search.search_venues("Venue 1")} >= {"Venue 1"}
@@ -0,0 +1,16 @@
+def shows_page(client, statements):
+    statements.clear()
+    response = client.get("/shows")
+    assert response.status_code == 200
+    return response.get_data(as_text=True), len(statements)
+
+
+def test_shows_page_runs_one_query_for_any_number_of_shows(client, statements, seed):
+    seed(venues=2, artists=2, shows=2)
+    page, few = shows_page(client, statements)
+    assert page.count("tile-show") == 2
+
+    seed(venues=10, artists=10, shows=45)
+    page, many = shows_page(client, statements)
+    assert page.count("tile-show") == 47
+    assert few == many == 1
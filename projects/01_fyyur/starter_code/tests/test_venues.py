@@ -0,0 +1,18 @@
+def venues_page(client, statements):
+    statements.clear()
+    response = client.get("/venues")
+    assert response.status_code == 200
+    return response.get_data(as_text=True), len(statements)
+
+
+def test_venues_page_runs_the_same_queries_for_any_number_of_venues(
+    client, statements, seed
+):
+    seed(venues=3, artists=2, shows=6)
+    page, few = venues_page(client, statements)
+    assert "Venue 3" in page
+
+    seed(venues=40, shows=80)
+    page, many = venues_page(client, statements)
+    assert "Venue 43" in page
+    assert many == few
@@ -0,0 +1,197 @@
+# ----------------------------------------------------------------------------#
+# Venue views: listing, search, venue page, create, edit and delete.
+# ----------------------------------------------------------------------------#
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+
+import queries
+import search
+import suggest
+from extensions import page_cache
+from models import Venue, db, genres_by_name
+
+blueprint = Blueprint("venues", __name__)
+
+
+@blueprint.route("/venues")
+@page_cache.cached(lambda: ("venues",))
+def venues():
+    # one query: every venue with its maintained upcoming shows counter,
+    # ordered so that venues of the same area are adjacent (see queries.py)
+    page = queries.paginate(*queries.venue_listing(request.args.get("genre")))
+    return render_template(
+        "pages/venues.html", areas=queries.group_areas(page.items), page=page
+    )
+
+
+@blueprint.route("/venues/search", methods=["POST"])
+def search_venues():
+    # ranked search on name, city, state and genres (see search.py)
+    # seach for Hop should return "The Musical Hop".
+    # search for "Music" should return "The Musical Hop" and "Park Square Live Music & Coffee"
+    search_key = request.form.get("search_term", "")
+    venue_data = search.search_venues(search_key)
+    response = {
+        "count": len(venue_data),
+        "data": venue_data,
+    }
+    return render_template(
+        "pages/search_venues.html",
+        results=response,
+        search_term=search_key,
+    )
+
+
+@blueprint.route("/venues/<int:venue_id>")
+@page_cache.cached(lambda venue_id: (f"venue:{venue_id}", "venue-pages"))
+def show_venue(venue_id):
+    # shows the venue page with the given venue_id
+    data = queries.detail_with_shows(queries.VENUE_DETAIL, venue_id)
+    return render_template("pages/show_venue.html", venue=data)
+
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+
+@blueprint.route("/venues/create", methods=["GET"])
+def create_venue_form():
+    from forms import VenueForm
+
+    form = VenueForm()
+    return render_template("forms/new_venue.html", form=form)
+
+
+@blueprint.route("/venues/create", methods=["POST"])
+def create_venue_submission():
+    # TODO: insert form data as a new Venue record in the db, instead
+    # TODO: modify data to be the data object returned from db insertion
+    name = request.form.get("name")
+    city = request.form.get("city")
+    state = request.form.get("state")
+    address = request.form.get("address")
+    phone = request.form.get("phone")
+    image_link = request.form.get("image_link")
+    facebook_link = request.form.get("facebook_link")
+    website_link = request.form.get("website_link")
+    seeking_talent = request.form.get("seeking_artist")
+    seeking_description = request.form.get("seeking_description")
+    genres = request.form.get("genres")
+
+    if seeking_talent == "y":
+        seeking_talent = True
+    else:
+        seeking_talent = False
+    data = Venue(
+        name=name,
+        city=city,
+        state=state,
+        address=address,
+        phone=phone,
+        image_link=image_link,
+        facebook_link=facebook_link,
+        website_link=website_link,
+        seeking_talent=seeking_talent,
+        seeking_description=seeking_description,
+        genres=genres,
+    )
+    try:
+        data.genre_tags = genres_by_name(request.form.getlist("genres"))
+        db.session.add(data)
+        db.session.commit()
+        suggest.add("venue", data.id, data.name)
+        page_cache.invalidate("venues")
+        flash("Venue " + request.form["name"] + " was successfully listed!")
+    except:
+        db.session.rollback()
+        flash("An error occurred. Venue " + data.name + " could not be listed.")
+    finally:
+        db.session.close()
+
+    # on successful db insert, flash success
+    # TODO: on unsuccessful db insert, flash an error instead.
+    # e.g., flash('An error occurred. Venue ' + data.name + ' could not be listed.')
+    # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+    return render_template("pages/home.html")
+
+
+@blueprint.route("/venues/<venue_id>", methods=["DELETE"])
+def delete_venue(venue_id):
+    # TODO: Complete this endpoint for taking a venue_id, and using
+    # SQLAlchemy ORM to delete a record. Handle cases where the session commit could fail.
+    try:
+        venue_to_remove = Venue.query.filter(Venue.id == venue_id).first()
+        db.session.delete(venue_to_remove)
+        db.session.commit()
+        suggest.remove("venue", venue_to_remove.id)
+        page_cache.invalidate(
+            "venues", f"venue:{venue_to_remove.id}", "shows", "artist-pages"
+        )
+    except:
+        db.session.rollback()
+    finally:
+        db.session.close()
+    # BONUS CHALLENGE: Implement a button to delete a Venue on a Venue Page, have it so that
+    # clicking that button delete it from the db then redirect the user to the homepage
+    return None
+
+
+#  Update
+#  ----------------------------------------------------------------
+
+
+@blueprint.route("/venues/<int:venue_id>/edit", methods=["GET"])
+def edit_venue(venue_id):
+    from forms import VenueForm
+
+    form = VenueForm()
+    venue_data = Venue.query.filter(Venue.id == venue_id).first()
+
+    venue = {
+        "id": venue_data.id,
+        "name": venue_data.name,
+        "genres": venue_data.genres,
+        "address": venue_data.address,
+        "city": venue_data.city,
+        "state": venue_data.state,
+        "phone": venue_data.phone,
+        "website": venue_data.website_link,
+        "facebook_link": venue_data.facebook_link,
+        "seeking_talent": venue_data.seeking_talent,
+        "seeking_description": venue_data.seeking_description,
+        "image_link": venue_data.image_link,
+    }
+    # TODO: populate form with values from venue with ID <venue_id>
+    return render_template("forms/edit_venue.html", form=form, venue=venue)
+
+
+@blueprint.route("/venues/<int:venue_id>/edit", methods=["POST"])
+def edit_venue_submission(venue_id):
+    # TODO: take values from the form submitted, and update existing
+    # venue record with ID <venue_id> using the new attributes
+
+    venue_data = Venue.query.filter(Venue.id == venue_id).first()
+    try:
+        venue_data.name = request.form.get("name")
+        venue_data.genres = request.form.get("genres")
+        venue_data.genre_tags = genres_by_name(request.form.getlist("genres"))
+        venue_data.address = request.form.get("address")
+        venue_data.city = request.form.get("city")
+        venue_data.state = request.form.get("state")
+        venue_data.phone = request.form.get("phone")
+        venue_data.website_link = request.form.get("website_link")
+        venue_data.facebook_link = request.form.get("facebook_link")
+        venue_data.seeking_talent = request.form.get("seeking_talent") == "y"
+        venue_data.seeking_description = request.form.get("seeking_description")
+        venue_data.image_link = request.form.get("image_link")
+
+        # save the changes in the database
+        db.session.commit()
+        suggest.add("venue", venue_data.id, venue_data.name)
+        page_cache.invalidate("venues", f"venue:{venue_id}", "shows", "artist-pages")
+    except:
+        db.session.rollback()
+        flash("Venue data could not be updated!")
+    finally:
+        db.session.close()
+
+    return redirect(url_for("venues.show_venue", venue_id=venue_id))